@@ -0,0 +1,427 @@
+import os
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+import metrics
+
+# ---------- CONFIG ----------
+# Set TRAVELSMART_OFFLINE=1 to route every outbound call to the local stand-ins
+OFFLINE = os.environ.get("TRAVELSMART_OFFLINE", "0") == "1"
+
+# Per-service limits: token bucket (rate/sec + burst), pool size, breaker settings
+SERVICE_LIMITS = {
+    "gemini":    {"rate": 2.0, "burst": 5,  "workers": 4, "timeout": 60, "failures": 3, "cooldown": 30},
+    "translate": {"rate": 5.0, "burst": 10, "workers": 8, "timeout": 15, "failures": 5, "cooldown": 20},
+    "tts":       {"rate": 3.0, "burst": 6,  "workers": 4, "timeout": 30, "failures": 5, "cooldown": 20},
+    "wikipedia": {"rate": 5.0, "burst": 10, "workers": 4, "timeout": 15, "failures": 5, "cooldown": 30},
+    "ipinfo":    {"rate": 1.0, "burst": 3,  "workers": 2, "timeout": 5,  "failures": 3, "cooldown": 60},
+    "nominatim": {"rate": 1.0, "burst": 1,  "workers": 1, "timeout": 10, "failures": 3, "cooldown": 60},  # OSM policy: 1 req/s
+}
+LAST_GOOD_MAX = 512  # cached good responses kept per service for fallbacks
+# ----------------------------
+
+
+class ServiceUnavailable(Exception):
+    """Raised when a service call fails and no cached/fallback response exists."""
+
+
+class RateLimited(ServiceUnavailable):
+    """Our own token bucket had no slot in time; the upstream service was never called."""
+
+
+# ---------------- RATE LIMITING ----------------
+class TokenBucket:
+    def __init__(self, rate, burst):
+        self.rate = float(rate)
+        self.capacity = float(burst)
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, timeout=None):
+        """Block until a token is available. Returns False if `timeout` expires first."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1.0:
+                    self.tokens -= 1.0
+                    return True
+                wait = (1.0 - self.tokens) / self.rate
+            if deadline is not None and time.monotonic() + wait > deadline:
+                return False
+            time.sleep(wait)
+
+
+# ---------------- REQUEST COALESCING ----------------
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Identical in-flight calls (same key) share one execution and its result."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.flights = {}
+        self.coalesced = 0
+
+    def do(self, key, fn, *args, **kwargs):
+        with self.lock:
+            flight = self.flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = _Flight()
+                self.flights[key] = flight
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = fn(*args, **kwargs)
+            return flight.result
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self.lock:
+                self.flights.pop(key, None)
+            flight.done.set()
+
+
+# ---------------- CIRCUIT BREAKER ----------------
+# Client libraries' transport errors that carry no HTTP status (matched by name so
+# the optional libraries needn't be imported): deep_translator, wikipedia, gTTS
+# (raised without a response when the request itself failed) and geopy
+UPSTREAM_ERROR_NAMES = {
+    "RequestError", "TooManyRequests", "HTTPTimeoutError", "gTTSError",
+    "GeocoderTimedOut", "GeocoderUnavailable", "GeocoderRateLimited",
+}
+
+
+def _status_code(error):
+    """HTTP status attached to a client library's exception, if any."""
+    for obj in (error, getattr(error, "response", None), getattr(error, "rsp", None)):
+        for attr in ("status_code", "code"):
+            value = getattr(obj, attr, None)
+            if isinstance(value, int) and 100 <= value < 600:
+                return value
+    return None
+
+
+def is_upstream_failure(error):
+    """True for timeouts, transport errors, 5xx and 429 — the failures that say the
+    service is unhealthy. Errors about the request itself (unknown page, unsupported
+    language, text too long, 4xx) say nothing about the service and don't count."""
+    if isinstance(error, (TimeoutError, FutureTimeout)):
+        return True
+    status = _status_code(error)
+    if status is not None:
+        return status >= 500 or status == 429
+    return type(error).__name__ in UPSTREAM_ERROR_NAMES or isinstance(error, OSError)
+
+
+class CircuitBreaker:
+    """closed -> open after `max_failures` in a row; after `cooldown` seconds half-open,
+    where a single probe call is let through and its outcome closes or reopens it."""
+
+    def __init__(self, max_failures, cooldown):
+        self.max_failures = max_failures
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+        self.lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self.lock:
+            if self.opened_at is None:
+                return "closed"
+            if time.monotonic() - self.opened_at >= self.cooldown:
+                return "half-open"
+            return "open"
+
+    def allow(self):
+        with self.lock:
+            if self.opened_at is None:
+                return True
+            if self.probing or time.monotonic() - self.opened_at < self.cooldown:
+                return False
+            self.probing = True
+            return True
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.probing = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            self.probing = False
+            if self.failures >= self.max_failures:
+                self.opened_at = time.monotonic()
+
+    def release(self):
+        """End a call that proved nothing either way (e.g. a bad request); frees the probe slot."""
+        with self.lock:
+            self.probing = False
+
+
+# ---------------- SERVICE CLIENT ----------------
+class ServiceClient:
+    def __init__(self, name, rate, burst, workers, timeout, failures, cooldown):
+        self.name = name
+        self.timeout = timeout
+        self.workers = workers
+        self.bucket = TokenBucket(rate, burst)
+        self.flight = SingleFlight()
+        self.breaker = CircuitBreaker(failures, cooldown)
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"api-{name}")
+        self.last_good = OrderedDict()  # key -> last successful response, served while the breaker is open
+        self.stats = {"calls": 0, "errors": 0, "fallbacks": 0}
+        self._session = None
+        self._session_lock = threading.Lock()
+
+    @property
+    def session(self):
+        """Pooled HTTP session for services we call over plain HTTP."""
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    import requests
+                    from requests.adapters import HTTPAdapter
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.workers)
+                    session.mount("https://", adapter)
+                    session.mount("http://", adapter)
+                    self._session = session
+        return self._session
+
+    def _fallback(self, key, fallback, error):
+        self.stats["fallbacks"] += 1
+        cached = self.last_good.get(key)
+        if cached is not None:
+            return cached
+        if fallback is not None:
+            return fallback() if callable(fallback) else fallback
+        raise ServiceUnavailable(f"{self.name} unavailable: {error}")
+
+    def _run(self, fn, args, kwargs):
+        """One upstream request. Runs once per flight, so coalesced callers never
+        count the same failure twice; local rate-limit waits and errors about the
+        request itself don't reach the breaker."""
+        if not self.bucket.acquire(timeout=self.timeout):
+            self.breaker.release()
+            raise RateLimited(f"{self.name} rate limit wait exceeded {self.timeout}s")
+        try:
+            result = self.pool.submit(fn, *args, **kwargs).result(timeout=self.timeout)
+        except Exception as e:
+            if is_upstream_failure(e):
+                self.breaker.record_failure()
+            else:
+                self.breaker.release()
+            raise
+        self.breaker.record_success()
+        return result
+
+    def call(self, key, fn, *args, fallback=None, **kwargs):
+        """Rate-limited, coalesced, breaker-protected call of `fn(*args, **kwargs)`.
+
+        `key` identifies identical requests; `fallback` is a value or zero-arg callable
+        used when the call fails and no previous good response is cached.
+        """
+        self.stats["calls"] += 1
+        if not self.breaker.allow():
+            return self._fallback(key, fallback, "circuit open")
+        try:
+            with metrics.span(f"api.{self.name}"):
+                result = self.flight.do(key, self._run, fn, args, kwargs)
+        except Exception as e:
+            self.stats["errors"] += 1
+            return self._fallback(key, fallback, e)
+        self.last_good[key] = result
+        self.last_good.move_to_end(key)
+        while len(self.last_good) > LAST_GOOD_MAX:
+            self.last_good.popitem(last=False)
+        return result
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(name):
+    """Process-wide client for `name` (one of SERVICE_LIMITS), shared by all sessions."""
+    client = _clients.get(name)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(name)
+            if client is None:
+                client = ServiceClient(name, **SERVICE_LIMITS[name])
+                _clients[name] = client
+    return client
+
+
+def client_stats():
+    return {
+        name: {**c.stats, "coalesced": c.flight.coalesced, "breaker": c.breaker.state}
+        for name, c in _clients.items()
+    }
+
+
+def make_key(*parts):
+    return hashlib.sha1("\x1f".join(str(p) for p in parts).encode("utf-8")).hexdigest()
+
+
+# ---------------- LOCAL STAND-INS ----------------
+# Deterministic offline replacements with a small simulated latency, for load tests.
+STANDIN_LATENCY = float(os.environ.get("TRAVELSMART_STANDIN_LATENCY", "0.05"))
+
+
+def _standin_sleep(scale=1.0):
+    if STANDIN_LATENCY > 0:
+        time.sleep(STANDIN_LATENCY * scale)
+
+
+def fake_generate(prompt):
+    _standin_sleep(4)
+    return f"[offline guide] {prompt.strip()[:200]}"
+
+
+def fake_translate(text, source="auto", target="en"):
+    _standin_sleep()
+    return text if target == "en" else f"[{target}] {text}"
+
+
+def fake_tts_save(text, lang, path):
+    _standin_sleep(2)
+    with open(path, "wb") as f:
+        f.write(b"ID3" + text.encode("utf-8")[:64])
+    return path
+
+
+def fake_wiki_summary(title, sentences=2):
+    _standin_sleep()
+    return f"{title} is a landmark in India."
+
+
+def fake_ipinfo():
+    _standin_sleep()
+    return {"loc": "13.0827,80.2707", "region": "Tamil Nadu", "city": "Chennai"}
+
+
+def fake_reverse_geocode(lat, lon):
+    _standin_sleep()
+    return {"address": {"state": "Tamil Nadu"}}
+
+
+# ---------------- SERVICE HELPERS ----------------
+_translators = threading.local()
+
+
+def get_translator(source="auto", target="en"):
+    """GoogleTranslator for (source, target), one per thread.
+
+    deep_translator keeps the text of the call in progress on the instance
+    (`_url_params["q"]`), so an instance must never be shared between threads.
+    """
+    cache = getattr(_translators, "by_pair", None)
+    if cache is None:
+        cache = _translators.by_pair = {}
+    translator = cache.get((source, target))
+    if translator is None:
+        from deep_translator import GoogleTranslator
+        translator = cache[(source, target)] = GoogleTranslator(source=source, target=target)
+    return translator
+
+
+def generate(model, prompt, fallback=None):
+    if OFFLINE or model is None:
+        fn, args = fake_generate, (prompt,)
+    else:
+        fn, args = (lambda p: model.generate_content(p).text), (prompt,)
+    return get_client("gemini").call(make_key("gemini", prompt), fn, *args, fallback=fallback)
+
+
+def translate(text, target="en", source="auto"):
+    if OFFLINE:
+        fn = lambda t: fake_translate(t, source, target)
+    else:
+        fn = lambda t: get_translator(source, target).translate(t)  # resolved on the pool thread
+    # On failure fall back to the untranslated text rather than breaking the page
+    return get_client("translate").call(make_key("translate", source, target, text), fn, text, fallback=text)
+
+
+def translate_many(texts, target="en", source="auto"):
+    """Translate each text as its own rate-limited call (one token and timeout per text).
+
+    Google has no batch endpoint (deep_translator's translate_batch just loops), so a
+    batch is as many upstream requests as texts. Raises ServiceUnavailable on failure.
+    """
+    client = get_client("translate")
+    if OFFLINE:
+        fn = lambda t: fake_translate(t, source, target)
+    else:
+        fn = lambda t: get_translator(source, target).translate(t)
+    return [client.call(make_key("translate", source, target, text), fn, text) for text in texts]
+
+
+def synthesize(text, lang, path):
+    """Render `text` to an mp3 at `path`; identical concurrent requests share one render."""
+    if OFFLINE:
+        fn = fake_tts_save
+    else:
+        def fn(t, l, p):
+            from gtts import gTTS
+            gTTS(text=t, lang=l).save(p)
+            return p
+    return get_client("tts").call(make_key("tts", lang, path, text), fn, text, lang, path)
+
+
+def wiki_summary(title, sentences=2, fallback=None):
+    if OFFLINE:
+        fn = fake_wiki_summary
+    else:
+        import wikipedia
+        fn = wikipedia.summary
+    return get_client("wikipedia").call(
+        make_key("wikipedia", title, sentences), fn, title, sentences=sentences, fallback=fallback
+    )
+
+
+def ip_info():
+    """ipinfo.io JSON for the server's public IP, or {} if unavailable."""
+    client = get_client("ipinfo")
+    if OFFLINE:
+        fn = fake_ipinfo
+    else:
+        fn = lambda: client.session.get("https://ipinfo.io/json", timeout=client.timeout).json()
+    return client.call(make_key("ipinfo"), fn, fallback={})
+
+
+def reverse_geocode(lat, lon):
+    """Nominatim reverse lookup raw dict, or {} if unavailable."""
+    if OFFLINE:
+        fn = fake_reverse_geocode
+    else:
+        def fn(la, lo):
+            from geopy.geocoders import Nominatim
+            location = Nominatim(user_agent="tourist_app").reverse((la, lo), exactly_one=True, language="en", timeout=10)
+            return location.raw if location else {}
+    return get_client("nominatim").call(make_key("nominatim", round(lat, 4), round(lon, 4)), fn, lat, lon, fallback={})
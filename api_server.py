@@ -0,0 +1,409 @@
+"""Headless batch HTTP API over the TravelSmart features, for partner systems.
+
+    python api_server.py [--port 8600] [--clip-processes 1] [--io-threads 16]
+
+Every endpoint takes a batch (a list of one is fine) and answers JSON:
+
+    POST /v1/detect           {"images": [<base64 JPEG/PNG>, ...], "k": 3}   (or a raw image/* body)
+    POST /v1/route-risk       {"routes": [[[lat, lng], [lat, lng], ...], ...], "radius_km": 2.0}
+    POST /v1/recommendations  {"states": ["Kerala", ...]}
+    POST /v1/describe         {"places": ["Red Fort", ...], "lang": "English"}
+    GET  /health              pool sizes, in-flight requests and rejections per endpoint
+    GET  /metrics             Prometheus text (spans need TRAVELSMART_METRICS=1)
+
+CLIP scoring runs in a process pool (each worker loads the model once), Gemini
+calls fan out over a thread pool, and each endpoint admits a bounded number of
+requests at a time; beyond that it answers 429 with Retry-After instead of queueing.
+"""
+import io
+import os
+import sys
+import json
+import base64
+import argparse
+import threading
+from functools import lru_cache
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+import api_clients
+import datasets
+import geo_index
+import metrics
+
+# ---------- CONFIG ----------
+API_HOST = os.environ.get("TRAVELSMART_API_HOST", "127.0.0.1")
+API_PORT = int(os.environ.get("TRAVELSMART_API_PORT", "8600"))
+CLIP_PROCESSES = int(os.environ.get("TRAVELSMART_API_CLIP_PROCESSES", "1"))  # each holds a CLIP model
+IO_THREADS = int(os.environ.get("TRAVELSMART_API_IO_THREADS", "16"))
+CLIP_BATCH = 8               # images scored per process-pool task
+MAX_BATCH = 64               # items per request
+MAX_BODY_BYTES = 32 * 2**20
+REQUEST_TIMEOUT = 60         # seconds a request may wait on its pool
+LISTEN_BACKLOG = 128         # pending TCP connections before the OS refuses new ones
+ROUTE_RADIUS_KM = 2.0        # hotspots this close to a route count against it
+ROUTE_MIN_RADIUS_KM = 0.1
+ROUTE_MAX_RADIUS_KM = 50.0
+ROUTE_MAX_SAMPLES = 2000     # points a route is checked at (one every radius/2); longer routes get 400
+ROUTE_MAX_HOTSPOTS = 20      # hotspots listed per route
+MAX_K = 20                   # matches returned per image
+# Requests admitted per endpoint at once (running + waiting); the rest get 429
+QUEUE_LIMITS = {"detect": 8, "route-risk": 64, "recommendations": 128, "describe": 32}
+# ----------------------------
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+# ---------------- LANDMARK DETECTION (process pool) ----------------
+_detector = None  # per worker process: (model, preprocess, text_embeddings, names, device, threshold)
+
+
+def load_detector():
+    import finalhistoryapp
+    names, _ = finalhistoryapp.load_landmarks(finalhistoryapp.LANDMARKS_JSON)
+    model, preprocess, text_embeddings = finalhistoryapp.load_clip(names)
+    return model, preprocess, text_embeddings, names, finalhistoryapp.DEVICE, finalhistoryapp.SIMILARITY_THRESHOLD
+
+
+def _init_detector(loader, torch_threads):
+    global _detector
+    import torch
+    torch.set_num_threads(torch_threads)  # keep the worker processes from oversubscribing cores
+    _detector = loader()
+
+
+def _ping():
+    return os.getpid()
+
+
+def _detect_chunk(images, k):
+    """Top-k matches for a list of encoded images (runs inside a worker process)."""
+    from PIL import Image
+    import finalhistoryapp
+    model, preprocess, text_embeddings, names, device, threshold = _detector
+    results, decoded, slots = [None] * len(images), [], []
+    for i, data in enumerate(images):
+        try:
+            decoded.append(Image.open(io.BytesIO(data)).convert("RGB"))
+            slots.append(i)
+        except Exception as e:
+            results[i] = {"error": f"unreadable image ({type(e).__name__})"}
+    if decoded:
+        matches = finalhistoryapp.clip_top_k(model, preprocess, decoded, text_embeddings, names, device, k)
+        for i, top in zip(slots, matches):
+            best_name, best_score = top[0]
+            results[i] = {
+                "landmark": best_name if best_score >= threshold else None,
+                "matches": [{"name": name, "score": round(score, 2)} for name, score in top],
+            }
+    return results
+
+
+# ---------------- ROUTE RISK ----------------
+def _densify(points, step_km):
+    """Points along the polyline no more than `step_km` apart (including the vertices)."""
+    lats, lngs = points[:, 0], points[:, 1]
+    seg_km = geo_index.haversine_km(lats[:-1], lngs[:-1], lats[1:], lngs[1:])
+    steps = np.maximum(np.ceil(seg_km / step_km).astype(np.int64), 1)
+    if steps.sum() + 1 > ROUTE_MAX_SAMPLES:
+        raise ApiError(400, f"route too long for radius_km={step_km * 2:g}: over {ROUTE_MAX_SAMPLES} sample "
+                            f"points ({seg_km.sum():.0f} km); split it or use a larger radius")
+    seg = np.repeat(np.arange(len(seg_km)), steps)
+    frac = (np.arange(steps.sum()) - np.repeat(np.cumsum(steps) - steps, steps)) / np.repeat(steps, steps)
+    sampled = points[seg] + (points[seg + 1] - points[seg]) * frac[:, None]
+    return np.vstack([sampled, points[-1:]]), float(seg_km.sum())
+
+
+def route_risk(points, radius_km=ROUTE_RADIUS_KM):
+    """Hotspots within `radius_km` of a route and a proximity-weighted risk score."""
+    try:
+        points = np.asarray(points, dtype=np.float64)
+    except (TypeError, ValueError):
+        raise ApiError(400, "a route must be a list of numeric [lat, lng] points")
+    if points.ndim != 2 or points.shape[1] != 2 or len(points) < 2:
+        raise ApiError(400, "a route needs at least two [lat, lng] points")
+    if not np.isfinite(points).all() or np.abs(points[:, 0]).max() > 90 or np.abs(points[:, 1]).max() > 180:
+        raise ApiError(400, "route coordinates out of range")
+    index, ds = geo_index.index_for("hotspots")
+    samples, length_km = _densify(points, radius_km / 2)
+
+    hits = index.radius_batch(samples[:, 0], samples[:, 1], radius_km)
+    idx = np.concatenate([h[0] for h in hits]) if hits else np.empty(0, dtype=np.int64)
+    dist = np.concatenate([h[1] for h in hits]) if hits else np.empty(0)
+    order = np.lexsort((dist, idx))              # closest approach per hotspot first
+    idx, dist = idx[order], dist[order]
+    first = np.unique(idx, return_index=True)[1]
+    idx, dist = idx[first], dist[first]
+
+    risk = np.asarray(ds["risk_level"], dtype=np.float64)[idx]
+    score = float(np.sum(risk * (1 - dist / radius_km)))
+    top = np.lexsort((dist, -risk))[:ROUTE_MAX_HOTSPOTS]
+    return {
+        "length_km": round(length_km, 2),
+        "hotspot_count": int(len(idx)),
+        "max_risk": int(risk.max()) if len(risk) else 0,
+        "risk_score": round(score, 2),
+        "hotspots": [
+            {"name": str(ds["name"][i]), "crime_type": str(ds["crime_type"][i]),
+             "risk_level": int(r), "distance_km": round(float(d), 2)}
+            for i, r, d in zip(idx[top], risk[top], dist[top])
+        ],
+    }
+
+
+# ---------------- RECOMMENDATIONS / DESCRIPTIONS ----------------
+def recommendations(state):
+    from recommendapp import find_state_row
+    row = find_state_row(datasets.load_frame("recommend"), str(state))
+    if row is None:
+        return {"state": state, "found": False}
+    fields = {k: str(v) for k, v in row.items() if isinstance(v, str) and v.strip()}
+    return {"state": row["State/UT"], "found": True, "recommendations": fields}
+
+
+@lru_cache(maxsize=1024)
+def _place_info(place, lang):
+    import chatbot2
+    return chatbot2.place_info(place, lang)  # exceptions aren't cached, so failures are retried
+
+
+def describe(place, lang):
+    try:
+        return {"place": place, "lang": lang, "description": _place_info(place, lang)}
+    except api_clients.ServiceUnavailable as e:
+        return {"place": place, "lang": lang, "error": f"description unavailable: {e}"}
+
+
+# ---------------- SERVICE ----------------
+class Service:
+    def __init__(self, clip_processes=CLIP_PROCESSES, io_threads=IO_THREADS, queue_limits=None,
+                 detector_loader=load_detector):
+        self.io_pool = ThreadPoolExecutor(io_threads, thread_name_prefix="api-io")
+        self.clip_processes = clip_processes
+        self.clip_pool = None
+        if clip_processes > 0:
+            torch_threads = max(1, (os.cpu_count() or 1) // clip_processes)
+            self.clip_pool = ProcessPoolExecutor(clip_processes, initializer=_init_detector,
+                                                 initargs=(detector_loader, torch_threads))
+        self.limits = dict(QUEUE_LIMITS, **(queue_limits or {}))
+        self.gates = {name: threading.BoundedSemaphore(limit) for name, limit in self.limits.items()}
+        self.in_flight = {name: 0 for name in self.limits}
+        self.rejected = {name: 0 for name in self.limits}
+        self.lock = threading.Lock()
+
+    def warm_up(self):
+        """Start the CLIP processes (and load their models) before the first request."""
+        if self.clip_pool is not None:
+            for _ in range(self.clip_processes):
+                self.clip_pool.submit(_ping)
+
+    @contextmanager
+    def admit(self, endpoint):
+        if not self.gates[endpoint].acquire(blocking=False):
+            with self.lock:
+                self.rejected[endpoint] += 1
+            raise ApiError(429, f"{endpoint} is at capacity ({self.limits[endpoint]} requests in flight)")
+        with self.lock:
+            self.in_flight[endpoint] += 1
+        try:
+            yield
+        finally:
+            with self.lock:
+                self.in_flight[endpoint] -= 1
+            self.gates[endpoint].release()
+
+    def health(self):
+        with self.lock:
+            return {
+                "status": "ok",
+                "clip_processes": self.clip_processes,
+                "io_threads": self.io_pool._max_workers,
+                "limits": self.limits,
+                "in_flight": dict(self.in_flight),
+                "rejected": dict(self.rejected),
+            }
+
+    def _gather(self, futures):
+        try:
+            return [f.result(timeout=REQUEST_TIMEOUT) for f in futures]
+        except FutureTimeout:
+            for f in futures:
+                f.cancel()
+            raise ApiError(504, "timed out waiting for workers")
+
+    # ---------- endpoints ----------
+    def detect(self, images, k=3):
+        if self.clip_pool is None:
+            raise ApiError(503, "landmark detection is disabled (--clip-processes 0)")
+        chunks = [images[i:i + CLIP_BATCH] for i in range(0, len(images), CLIP_BATCH)]
+        try:
+            parts = self._gather([self.clip_pool.submit(_detect_chunk, chunk, k) for chunk in chunks])
+        except BrokenProcessPool:
+            raise ApiError(503, "landmark detector failed to start (is CLIP installed?)")
+        return [r for part in parts for r in part]
+
+    def route_risk(self, routes, radius_km=ROUTE_RADIUS_KM):
+        return self._gather([self.io_pool.submit(route_risk, points, radius_km) for points in routes])
+
+    def recommendations(self, states):
+        return [recommendations(state) for state in states]
+
+    def describe(self, places, lang="English"):
+        return self._gather([self.io_pool.submit(describe, str(place), lang) for place in places])
+
+    def shutdown(self):
+        self.io_pool.shutdown(wait=False, cancel_futures=True)
+        if self.clip_pool is not None:
+            self.clip_pool.shutdown(wait=False, cancel_futures=True)
+
+
+# ---------------- HTTP ----------------
+def _batch(body, key):
+    items = body.get(key)
+    if not isinstance(items, list) or not items:
+        raise ApiError(400, f"expected a non-empty list in {key!r}")
+    if len(items) > MAX_BATCH:
+        raise ApiError(413, f"at most {MAX_BATCH} {key} per request")
+    return items
+
+
+def _number(body, key, default, kind=float, low=None, high=None):
+    value = body.get(key, default)
+    try:
+        if isinstance(value, bool):
+            raise TypeError
+        value = kind(value)
+    except (TypeError, ValueError, OverflowError):
+        raise ApiError(400, f"{key!r} must be a number")
+    if not (low <= value <= high):  # also rejects NaN
+        raise ApiError(400, f"{key!r} must be between {low:g} and {high:g}")
+    return value
+
+
+def _decode_images(items):
+    try:
+        return [base64.b64decode(item, validate=True) for item in items]
+    except (TypeError, ValueError):
+        raise ApiError(400, "images must be base64 strings")
+
+
+def make_handler(service):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _send(self, status, payload, headers=None):
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _read_body(self):
+            try:
+                length = int(self.headers.get("Content-Length") or 0)
+            except ValueError:
+                length = -1
+            if not 0 <= length <= MAX_BODY_BYTES:
+                self.close_connection = True  # the unread body is still on the socket
+                if length < 0:
+                    raise ApiError(400, "invalid Content-Length")
+                raise ApiError(413, f"request body over {MAX_BODY_BYTES} bytes")
+            return self.rfile.read(length)
+
+        def do_GET(self):
+            if self.path == "/health":
+                self._send(200, service.health())
+            elif self.path == "/metrics":
+                body = metrics.prometheus_text().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            else:
+                self._send(404, {"error": "not found"})
+
+        def do_POST(self):
+            endpoint = self.path.rstrip("/").rsplit("/", 1)[-1]
+            try:
+                raw = self._read_body()
+                if not self.path.startswith("/v1/") or endpoint not in service.limits:
+                    raise ApiError(404, "not found")
+                with service.admit(endpoint), metrics.span(f"server.{endpoint}"):
+                    results = self._dispatch(endpoint, raw)
+                self._send(200, {"results": results})
+            except ApiError as e:
+                headers = {"Retry-After": "1"} if e.status == 429 else None
+                self._send(e.status, {"error": str(e)}, headers)
+            except Exception as e:
+                self._send(500, {"error": f"{type(e).__name__}: {e}"})
+
+        def _dispatch(self, endpoint, raw):
+            if endpoint == "detect" and self.headers.get("Content-Type", "").startswith("image/"):
+                return service.detect([raw])
+            try:
+                body = json.loads(raw or b"{}")
+            except ValueError:
+                raise ApiError(400, "body must be JSON")
+            if not isinstance(body, dict):
+                raise ApiError(400, "body must be a JSON object")
+            if endpoint == "detect":
+                k = _number(body, "k", 3, int, 1, MAX_K)
+                return service.detect(_decode_images(_batch(body, "images")), k)
+            if endpoint == "route-risk":
+                radius = _number(body, "radius_km", ROUTE_RADIUS_KM, float, ROUTE_MIN_RADIUS_KM, ROUTE_MAX_RADIUS_KM)
+                return service.route_risk(_batch(body, "routes"), radius)
+            if endpoint == "recommendations":
+                return service.recommendations(_batch(body, "states"))
+            return service.describe(_batch(body, "places"), str(body.get("lang", "English")))
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = LISTEN_BACKLOG
+
+
+def make_server(service, host=API_HOST, port=API_PORT):
+    return _Server((host, port), make_handler(service))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default=API_HOST)
+    parser.add_argument("--port", type=int, default=API_PORT)
+    parser.add_argument("--clip-processes", type=int, default=CLIP_PROCESSES,
+                        help="CLIP worker processes (0 disables /v1/detect)")
+    parser.add_argument("--io-threads", type=int, default=IO_THREADS)
+    args = parser.parse_args(argv)
+
+    service = Service(args.clip_processes, args.io_threads)
+    service.warm_up()
+    server = make_server(service, args.host, args.port)
+    print(f"TravelSmart API on http://{args.host}:{server.server_port}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,22 +2,29 @@ import streamlit as st
 import os
 import base64
 
+import metrics
+
 # ----------------- PAGE CONFIG -----------------
 st.set_page_config(page_title="TravelSmart India", layout="wide")
 
 # ----------------- IMPORT FUNCTION MODULES -----------------
 from chatbot2 import ai_tour_guide
 from finalhistoryapp import clip_landmark_detector
-from translator import speech_translator
+from translator import speech_translator, stop_continuous
 from maplegend import crime_aware_route_planner
 from recommendapp import travel_assistant_app
 
+# ----------------- METRICS -----------------
+metrics.start_exporters()
+metrics.bind_session(st.session_state.setdefault("metrics_profile", []))
+
 # ----------------- HELPER FUNCTIONS -----------------
 def get_base64_of_image(image_file):
     with open(image_file, "rb") as f:
         data = f.read()
     return base64.b64encode(data).decode()
 
+@metrics.timed("app.set_background")
 def set_background(image_path):
     if os.path.exists(image_path):
         base64_image = get_base64_of_image(image_path)
@@ -91,42 +98,51 @@ menu_choice = st.sidebar.radio(
 
 inject_css()
 
+# Continuous translation keeps the microphone open only while its page is shown
+if menu_choice != "🌐 Voice-to-Voice Translator":
+    stop_continuous()
+
+if metrics.ENABLED and st.sidebar.checkbox("📈 Show performance profile"):
+    st.sidebar.dataframe(metrics.session_summary(st.session_state.metrics_profile), hide_index=True)
+
 # ----------------- PAGES -----------------
-if menu_choice == "🏠 Home":
-    set_background("background.jpg")
-    st.markdown(
-        """
-        <div class="overlay-container" style="text-align:center; padding-top:15%;">
-            <div class="overlay-title">Welcome to TravelSmart India!!</div>
-            <div class="overlay-subtext">Your Smart Companion for Safe and Fun Travel ✈️</div>
-        </div>
-        """,
-        unsafe_allow_html=True
-    )
-
-elif menu_choice == "🤖 Smart Tour Guide":
-    set_background("background_features1.jpg")
-    #st.header("🤖 Smart Tour Guide")
-    with st.spinner("Loading AI Tour Guide..."):
-        ai_tour_guide()
-
-elif menu_choice == "📍 Landmark Lens":
-    set_background("background_features2.jpg")
-    #st.header("📍 Landmark Lens")
-    clip_landmark_detector()
-
-elif menu_choice == "🌐 Voice-to-Voice Translator":
-    set_background("background_features3.jpg")
-    st.markdown("<h1 style='text-align:center; color:#2c3e50;'>🎙 Speech Translator with Auto Language Detection</h1>", unsafe_allow_html=True)
-    #st.header("🌐 Voice-to-Voice Translator")
-    speech_translator()
-
-elif menu_choice == "🛡️ Safe Route Planner":
-    set_background("background_features4.jpg")
-    #st.header("🛡️ Safe Route Planner")
-    crime_aware_route_planner()
-
-elif menu_choice == "✨ TravelSmart Recommendations":
-    set_background("background_features5.jpg")
-    #st.header("✨ TravelSmart Recommendations")
-    travel_assistant_app("recommend.csv")
+# Each page render is one span; st.stop() inside a page still closes it
+with metrics.span("page." + menu_choice.split(" ", 1)[1]):
+    if menu_choice == "🏠 Home":
+        set_background("background.jpg")
+        st.markdown(
+            """
+            <div class="overlay-container" style="text-align:center; padding-top:15%;">
+                <div class="overlay-title">Welcome to TravelSmart India!!</div>
+                <div class="overlay-subtext">Your Smart Companion for Safe and Fun Travel ✈️</div>
+            </div>
+            """,
+            unsafe_allow_html=True
+        )
+
+    elif menu_choice == "🤖 Smart Tour Guide":
+        set_background("background_features1.jpg")
+        #st.header("🤖 Smart Tour Guide")
+        with st.spinner("Loading AI Tour Guide..."):
+            ai_tour_guide()
+
+    elif menu_choice == "📍 Landmark Lens":
+        set_background("background_features2.jpg")
+        #st.header("📍 Landmark Lens")
+        clip_landmark_detector()
+
+    elif menu_choice == "🌐 Voice-to-Voice Translator":
+        set_background("background_features3.jpg")
+        st.markdown("<h1 style='text-align:center; color:#2c3e50;'>🎙 Speech Translator with Auto Language Detection</h1>", unsafe_allow_html=True)
+        #st.header("🌐 Voice-to-Voice Translator")
+        speech_translator()
+
+    elif menu_choice == "🛡️ Safe Route Planner":
+        set_background("background_features4.jpg")
+        #st.header("🛡️ Safe Route Planner")
+        crime_aware_route_planner()
+
+    elif menu_choice == "✨ TravelSmart Recommendations":
+        set_background("background_features5.jpg")
+        #st.header("✨ TravelSmart Recommendations")
+        travel_assistant_app("recommend.csv")
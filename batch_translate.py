@@ -0,0 +1,278 @@
+import os
+import sys
+import json
+import sqlite3
+import argparse
+import threading
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+
+import api_clients
+import lang_id
+
+# ---------- CONFIG ----------
+MEMORY_PATH = os.environ.get("TRAVELSMART_TM_PATH", "translation_memory.db")
+CHUNK_SIZE = 25       # phrases per worker task (each phrase is its own backend request)
+MAX_WORKERS = 4       # chunks translated concurrently
+# ----------------------------
+
+# Common tourist phrases, precomputed into every language as a phrasebook
+PHRASEBOOK = [
+    "Hello",
+    "Thank you",
+    "Please",
+    "Excuse me",
+    "How much does this cost?",
+    "Where is the railway station?",
+    "Where is the bus stand?",
+    "Where is the nearest hospital?",
+    "Where is the toilet?",
+    "I need help",
+    "Call the police",
+    "I am lost",
+    "Please take me to this address",
+    "How far is it?",
+    "Do you speak English?",
+    "I don't understand",
+    "Can you write it down?",
+    "What time does it open?",
+    "One ticket, please",
+    "Is this vegetarian?",
+    "Not spicy, please",
+    "Water, please",
+    "The bill, please",
+    "Where can I get a taxi?",
+    "Good morning",
+    "Good night",
+]
+
+
+def normalize(text):
+    """Cache-key form of a phrase: NFC, case-folded, single-spaced."""
+    return " ".join(unicodedata.normalize("NFC", text).casefold().split())
+
+
+# ---------------- TRANSLATION MEMORY ----------------
+class TranslationMemory:
+    """Persistent (normalized source, source lang, target lang) -> translation store."""
+
+    def __init__(self, path=MEMORY_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        with self.conn:
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS memory ("
+                " source TEXT NOT NULL, source_lang TEXT NOT NULL, target_lang TEXT NOT NULL,"
+                " translation TEXT NOT NULL,"
+                " PRIMARY KEY (source, source_lang, target_lang))"
+            )
+
+    def get_many(self, keys):
+        """{key: translation} for the (normalized, src, tgt) keys that are stored."""
+        found = {}
+        with self.lock:
+            for key in keys:
+                row = self.conn.execute(
+                    "SELECT translation FROM memory WHERE source=? AND source_lang=? AND target_lang=?", key
+                ).fetchone()
+                if row:
+                    found[key] = row[0]
+        return found
+
+    def put_many(self, items):
+        """Store (key, translation) pairs."""
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO memory (source, source_lang, target_lang, translation) VALUES (?, ?, ?, ?)",
+                [(*key, translation) for key, translation in items],
+            )
+
+    def __len__(self):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM memory").fetchone()[0]
+
+
+_memory = None
+_memory_lock = threading.Lock()
+
+
+def get_memory():
+    """Process-wide translation memory at MEMORY_PATH."""
+    global _memory
+    if _memory is None:
+        with _memory_lock:
+            if _memory is None:
+                _memory = TranslationMemory()
+    return _memory
+
+
+# ---------------- BATCH TRANSLATION ----------------
+def _chunks(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def translate_batch(phrases, targets, memory=None, chunk_size=CHUNK_SIZE, max_workers=MAX_WORKERS, stats=None,
+                    source=None):
+    """Translate every phrase into every target language.
+
+    Returns {(phrase, target): translation}. Duplicate phrases are translated once, hits
+    come from the translation memory, and misses go to the backend in chunks of
+    `chunk_size` with at most `max_workers` chunks in flight.
+
+    `source` is the phrases' language if the caller knows it; phrases are then passed
+    through unchanged for that target. Otherwise the detected language only keys the
+    memory and the backend is asked with source "auto", since a guess can be wrong.
+    """
+    memory = memory or get_memory()
+    stats = stats if stats is not None else {}
+    unique = list(dict.fromkeys(p.strip() for p in phrases if p and p.strip()))
+    source_langs = {p: source or lang_id.detect_language(p) for p in unique}
+
+    # One representative phrase per (normalized text, source lang)
+    keyed = {}
+    for p in unique:
+        keyed.setdefault((normalize(p), source_langs[p]), p)
+
+    wanted = [(norm, src, tgt) for (norm, src) in keyed for tgt in targets]
+    cached = memory.get_many(wanted)
+    memory_hits, passthrough, misses = len(cached), 0, {}
+    for key in wanted:
+        norm, src, tgt = key
+        if key in cached:
+            continue
+        if source is not None and src == tgt:
+            cached[key] = keyed[(norm, src)]
+            passthrough += 1
+            continue
+        misses.setdefault(tgt, []).append(key)
+
+    def run_chunk(tgt, keys):
+        texts = [keyed[(norm, src)] for norm, src, _ in keys]
+        return list(zip(keys, api_clients.translate_many(texts, target=tgt, source=source or "auto")))
+
+    fetched = []
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = [
+            pool.submit(run_chunk, tgt, chunk)
+            for tgt, keys in misses.items()
+            for chunk in _chunks(keys, chunk_size)
+        ]
+        for future in futures:
+            try:
+                fetched.extend(future.result())
+            except api_clients.ServiceUnavailable as e:
+                stats.setdefault("errors", []).append(str(e))
+    fetched = [(key, text) for key, text in fetched if text]
+    memory.put_many(fetched)
+    cached.update(fetched)
+
+    stats.update({
+        "phrases": len(unique),
+        "requested": len(wanted),
+        "memory_hits": memory_hits,
+        "passthrough": passthrough,
+        "translated": len(fetched),
+    })
+
+    results = {}
+    for p in phrases:
+        p = p.strip()
+        if not p:
+            continue
+        for tgt in targets:
+            key = (normalize(p), source_langs[p], tgt)
+            if key in cached:
+                results[(p, tgt)] = cached[key]
+    return results
+
+
+def translate_one(text, target, source=None):
+    """Single phrase through the translation memory (used by the live translator)."""
+    return translate_batch([text], [target], source=source).get((text.strip(), target), text)
+
+
+def prerender_speech(results, out_dir, max_workers=MAX_WORKERS):
+    """Render each translation to out_dir/<lang>/<hash>.mp3, skipping files that exist.
+
+    Returns {(phrase, target): path} for languages gTTS supports.
+    """
+    from gtts.lang import tts_langs
+    supported = tts_langs()
+    jobs = {}
+    for (phrase, tgt), text in results.items():
+        if tgt not in supported:
+            continue
+        path = os.path.join(out_dir, tgt, api_clients.make_key(tgt, text) + ".mp3")
+        jobs[(phrase, tgt)] = (text, tgt, path)
+
+    def render(job):
+        text, tgt, path = job
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            api_clients.synthesize(text, tgt, path)
+        return path
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        paths = dict(zip(jobs, pool.map(render, jobs.values())))
+    return paths
+
+
+# ---------------- CLI ----------------
+def _read_phrases(paths):
+    phrases = []
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            phrases.extend(line.strip() for line in f if line.strip())
+    return phrases
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch-translate phrases into one or more languages.")
+    parser.add_argument("files", nargs="*", help="text files with one phrase per line")
+    parser.add_argument("-p", "--phrase", action="append", default=[], help="phrase to translate (repeatable)")
+    parser.add_argument("--phrasebook", action="store_true", help="include the built-in tourist phrasebook")
+    parser.add_argument("-s", "--source", help="language code of the phrases (default: detected per phrase)")
+    parser.add_argument("-t", "--target", action="append", default=[], help="target language code (repeatable)")
+    parser.add_argument("--all-languages", action="store_true", help="every language the translator page offers")
+    parser.add_argument("--tts-dir", help="also pre-render speech for each result into this directory")
+    parser.add_argument("--out", help="write results as JSON here instead of stdout")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS)
+    args = parser.parse_args(argv)
+
+    phrases = _read_phrases(args.files) + args.phrase + (PHRASEBOOK if args.phrasebook else [])
+    targets = list(args.target)
+    if args.all_languages:
+        from gtts.lang import tts_langs  # same source as translator.lang_options
+        targets += sorted(tts_langs())
+    targets = list(dict.fromkeys(targets))
+    if not phrases or not targets:
+        parser.error("need at least one phrase and one target language")
+
+    stats = {}
+    results = translate_batch(phrases, targets, chunk_size=args.chunk_size, max_workers=args.workers, stats=stats,
+                              source=args.source)
+    audio = prerender_speech(results, args.tts_dir, args.workers) if args.tts_dir else {}
+
+    payload = {
+        "stats": stats,
+        "translations": [
+            {"phrase": p, "target": t, "translation": text, "audio": audio.get((p, t))}
+            for (p, t), text in results.items()
+        ],
+    }
+    out = json.dumps(payload, ensure_ascii=False, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(out)
+    else:
+        print(out)
+    print(f"{stats['requested']} requested, {stats['memory_hits']} from memory, "
+          f"{stats['passthrough']} already in the target language, {stats['translated']} translated",
+          file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Typed place query latency: serial translate->generate->synthesize vs the async pipeline.
+
+Runs fully offline against the api_clients stand-ins:
+
+    python benchmarks/bench_tour_pipeline.py [--runs 20] [--latency 0.05]
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import statistics
+
+os.environ["TRAVELSMART_OFFLINE"] = "1"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import api_clients  # noqa: E402
+import tour_pipeline  # noqa: E402
+
+PLACES = ["Taj Mahal", "Qutub Minar", "Red Fort", "India Gate", "Hawa Mahal", "Gateway of India"]
+
+
+def get_info(place, lang):
+    return api_clients.generate(None, f"Describe {place} in {lang}")
+
+
+def clean(text):
+    return " ".join(text.split())
+
+
+def time_runs(fn, runs, audio_path):
+    samples = []
+    for i in range(runs):
+        place = PLACES[i % len(PLACES)]
+        start = time.perf_counter()
+        fn(place, "English", "en", get_info, clean, audio_path)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.05, help="stand-in base latency in seconds")
+    args = parser.parse_args()
+    api_clients.STANDIN_LATENCY = args.latency
+    for limits in api_clients.SERVICE_LIMITS.values():
+        limits["rate"] = limits["burst"] = 1e6  # measure the pipeline, not the rate limiter
+
+    audio_path = os.path.join(tempfile.mkdtemp(), "bench.mp3")
+    for label, fn in [("serial", tour_pipeline.serial_place_query), ("pipeline", tour_pipeline.run_place_query)]:
+        samples = time_runs(fn, args.runs, audio_path)
+        print(f"{label:9s} median {statistics.median(samples):7.1f} ms   max {max(samples):7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
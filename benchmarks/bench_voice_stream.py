@@ -0,0 +1,68 @@
+"""Conversational latency of the streaming voice pipeline with synthetic audio.
+
+Latency is measured from the VAD closing each utterance to its translated audio being
+ready, using the stand-in recognizer and a simulated translate/speak delay. Before
+that, an 8 s utterance is segmented to check that long speech comes back whole:
+
+    python benchmarks/bench_voice_stream.py [--utterances 5] [--recognize 0.3] [--translate 0.1] [--speak 0.2]
+"""
+import os
+import sys
+import time
+import argparse
+import statistics
+from queue import Queue
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import voice_stream  # noqa: E402
+
+
+def check_long_utterance(seconds=8.0):
+    """Exit with an error unless `seconds` of continuous speech comes back as one whole segment."""
+    segments = Queue()
+    source = voice_stream.SyntheticSource([(0.5, 0), (seconds, 5000), (1.0, 0)])
+    voice_stream.CaptureThread(source, segments).run()
+    lengths = [len(item[1]) / voice_stream.SAMPLE_WIDTH / source.sample_rate
+               for item in iter(segments.get, None)]
+    if len(lengths) != 1 or lengths[0] < seconds:
+        sys.exit(f"{seconds:g} s utterance was cut into segments of {[round(x, 2) for x in lengths]} s")
+    print(f"long utterance  {seconds:7.1f} s of speech -> one {lengths[0]:.2f} s segment")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--utterances", type=int, default=5)
+    parser.add_argument("--length", type=float, default=2.0, help="seconds of speech per utterance")
+    parser.add_argument("--recognize", type=float, default=0.3)
+    parser.add_argument("--translate", type=float, default=0.1)
+    parser.add_argument("--speak", type=float, default=0.2)
+    args = parser.parse_args()
+
+    check_long_utterance()
+
+    pattern = [(0.8, 0)]
+    for _ in range(args.utterances):
+        pattern += [(args.length, 5000), (0.7, 0)]
+    source = voice_stream.SyntheticSource(pattern, realtime=True)
+    recognizer = voice_stream.ScriptedRecognizer(["where is the railway station"], delay=args.recognize)
+
+    def translate(text):
+        time.sleep(args.translate)
+        return text.upper()
+
+    pipeline = voice_stream.SegmentPipeline(
+        source, recognizer, translate, speak=lambda text: time.sleep(args.speak)
+    ).start()
+    pipeline.join()
+    latencies = [r["latency_ms"] for r in pipeline.drain() if r and r.get("latency_ms") is not None]
+
+    print(f"segments        {len(latencies)}")
+    print(f"utterance       {args.length * 1000:7.0f} ms")
+    print(f"latency median  {statistics.median(latencies):7.0f} ms")
+    print(f"latency max     {max(latencies):7.0f} ms")
+    print(f"end-of-speech   {voice_stream.SILENCE_SEC * 1000:7.0f} ms of silence before each cut (not included above)")
+
+
+if __name__ == "__main__":
+    main()
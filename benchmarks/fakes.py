@@ -0,0 +1,141 @@
+"""Deterministic local stand-ins used by the offline benchmarks.
+
+Importing this module switches api_clients to its offline stand-ins (Gemini, Google
+Translate, gTTS, Wikipedia, ipinfo, Nominatim) and lifts their rate limits so the
+benchmarks measure our code rather than the token buckets. OSRM and the browser
+geocoder are only called from the map's JavaScript, so they need no stand-in here.
+"""
+import os
+import sys
+import random
+
+os.environ["TRAVELSMART_OFFLINE"] = "1"
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import api_clients  # noqa: E402
+
+for _limits in api_clients.SERVICE_LIMITS.values():
+    _limits["rate"] = _limits["burst"] = 1e6
+
+CATEGORIES = [
+    "Monuments & Heritage Sites",
+    "Forts & Palaces",
+    "Temples & Religious Sites",
+    "Caves & Ancient Sites",
+    "Natural Wonders & Scenic Spots",
+    "Wildlife & National Parks",
+    "Modern Attractions",
+]
+
+# Rough bounding box of India
+LAT_RANGE = (8.0, 35.0)
+LNG_RANGE = (68.0, 97.0)
+
+
+# ---------------- SYNTHETIC DATASETS ----------------
+def make_landmarks(n, seed=0):
+    import pandas as pd
+    rng = random.Random(seed)
+    return pd.DataFrame({
+        "Category": [rng.choice(CATEGORIES) for _ in range(n)],
+        "Name": [f"Landmark {i}" for i in range(n)],
+        "Lat": [round(rng.uniform(*LAT_RANGE), 4) for _ in range(n)],
+        "Lng": [round(rng.uniform(*LNG_RANGE), 4) for _ in range(n)],
+    })
+
+
+def make_hotspots(n, seed=1, cities=None, city_km=3.0):
+    """`n` hotspots spread uniformly over India, or packed around `cities` centres
+    (normal spread of `city_km`) like real, mostly urban hotspot data."""
+    import pandas as pd
+    rng = random.Random(seed)
+    if cities:
+        centres = [(rng.uniform(*LAT_RANGE), rng.uniform(*LNG_RANGE)) for _ in range(cities)]
+        spread = city_km / 111.32
+        points = [(lat + rng.gauss(0, spread), lng + rng.gauss(0, spread))
+                  for lat, lng in (rng.choice(centres) for _ in range(n))]
+    else:
+        points = [(rng.uniform(*LAT_RANGE), rng.uniform(*LNG_RANGE)) for _ in range(n)]
+    return pd.DataFrame({
+        "name": [f"Hotspot {i}" for i in range(n)],
+        "lat": [round(lat, 4) for lat, _ in points],
+        "lng": [round(lng, 4) for _, lng in points],
+        "crime_type": ["Theft" for _ in range(n)],
+        "notes": ["" for _ in range(n)],
+        "risk_level": [rng.randint(1, 5) for _ in range(n)],
+    })
+
+
+def make_recommendations(n, template_csv=os.path.join(ROOT, "recommend.csv")):
+    """`n` rows shaped like recommend.csv, with unique state names."""
+    import pandas as pd
+    base = pd.read_csv(template_csv)
+    reps = -(-n // len(base))
+    df = pd.concat([base] * reps, ignore_index=True).iloc[:n].copy()
+    df["State/UT"] = [f"{name} {i}" for i, name in enumerate(df["State/UT"])]
+    return df
+
+
+# ---------------- CAMERA ----------------
+class SyntheticCapture:
+    """Drop-in for cv2.VideoCapture(0): yields deterministic BGR frames."""
+
+    def __init__(self, width=640, height=480, frames=None, seed=0):
+        import numpy as np
+        rng = np.random.default_rng(seed)
+        self.base = rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+        self.remaining = frames
+        self.count = 0
+
+    def isOpened(self):
+        return True
+
+    def read(self):
+        if self.remaining is not None:
+            if self.remaining <= 0:
+                return False, None
+            self.remaining -= 1
+        self.count += 1
+        # Shift the pattern so consecutive frames differ
+        import numpy as np
+        return True, np.roll(self.base, self.count, axis=1)
+
+    def release(self):
+        pass
+
+
+# ---------------- CLIP ----------------
+class FakeClipModel:
+    """Deterministic stand-in for a CLIP model: a fixed random projection of pixels."""
+
+    def __init__(self, dim=512, image_size=32, seed=0):
+        import torch
+        gen = torch.Generator().manual_seed(seed)
+        self.dim = dim
+        self.image_size = image_size
+        self.proj = torch.randn(3 * image_size * image_size, dim, generator=gen)
+
+    def encode_image(self, image):
+        return image.flatten(1) @ self.proj
+
+    def encode_text_embeddings(self, n, seed=1):
+        import torch
+        gen = torch.Generator().manual_seed(seed)
+        return torch.randn(n, self.dim, generator=gen)
+
+    def preprocess(self, pil_img):
+        import numpy as np
+        import torch
+        small = pil_img.convert("RGB").resize((self.image_size, self.image_size))
+        array = np.asarray(small, dtype=np.float32) / 255.0
+        return torch.from_numpy(array).permute(2, 0, 1).contiguous()
+
+
+def load_fake_detector(n_landmarks=65):
+    """Stand-in for api_server.load_detector(): the fake model scored against landmarks.json names."""
+    import json
+    with open(os.path.join(ROOT, "landmarks.json"), encoding="utf-8") as f:
+        names = list(json.load(f))[:n_landmarks]
+    model = FakeClipModel()
+    return model, model.preprocess, model.encode_text_embeddings(len(names)), names, "cpu", 22.0
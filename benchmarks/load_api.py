@@ -0,0 +1,199 @@
+"""Load test for api_server.py: concurrent batch clients against every endpoint.
+
+By default the server is started in-process on a free port with the offline
+stand-ins from fakes.py (including a fake CLIP model in the worker processes);
+pass --url to hit a server that is already running instead. For each concurrency
+level the harness reports per-endpoint throughput, p50/p95/p99 latency and how
+many requests were turned away with 429 (backpressure) or failed.
+
+    python benchmarks/load_api.py [--concurrency 1 8 32] [--requests 200] [--batch 8] [--out load_api.json]
+"""
+import io
+import os
+import sys
+import json
+import time
+import base64
+import random
+import shutil
+import argparse
+import tempfile
+import threading
+import statistics
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import fakes
+
+ENDPOINTS = ["detect", "route-risk", "recommendations", "describe"]
+
+
+# ---------------- PAYLOADS ----------------
+def _jpeg(seed, size=224):
+    import numpy as np
+    from PIL import Image
+    pixels = np.random.default_rng(seed).integers(0, 256, (size, size, 3), dtype=np.uint8)
+    buf = io.BytesIO()
+    Image.fromarray(pixels).save(buf, format="JPEG", quality=80)
+    return base64.b64encode(buf.getvalue()).decode("ascii")
+
+
+class Payloads:
+    def __init__(self, batch, seed=0):
+        import pandas as pd
+        self.batch = batch
+        self.rng = random.Random(seed)
+        self.images = [_jpeg(i) for i in range(16)]
+        self.states = list(pd.read_csv(os.path.join(fakes.ROOT, "recommend.csv"))["State/UT"])
+        with open(os.path.join(fakes.ROOT, "landmarks.json"), encoding="utf-8") as f:
+            self.places = list(json.load(f))
+        hotspots = pd.read_csv(os.path.join(fakes.ROOT, "hotspots.csv"))
+        self.anchors = list(zip(hotspots["lat"], hotspots["lng"]))
+
+    def route(self):
+        # A short city route that starts near a known hotspot
+        lat, lng = self.rng.choice(self.anchors)
+        points = [[lat, lng]]
+        for _ in range(self.rng.randint(1, 5)):
+            lat += self.rng.uniform(-0.03, 0.03)
+            lng += self.rng.uniform(-0.03, 0.03)
+            points.append([round(lat, 5), round(lng, 5)])
+        return points
+
+    def make(self, endpoint):
+        pick = lambda items: [self.rng.choice(items) for _ in range(self.batch)]  # noqa: E731
+        if endpoint == "detect":
+            return {"images": pick(self.images), "k": 3}
+        if endpoint == "route-risk":
+            return {"routes": [self.route() for _ in range(self.batch)]}
+        if endpoint == "recommendations":
+            return {"states": pick(self.states)}
+        return {"places": pick(self.places), "lang": "English"}
+
+
+# ---------------- CLIENT ----------------
+def post(url, payload, timeout):
+    data = json.dumps(payload).encode("utf-8")
+    req = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as res:
+            res.read()
+            status = res.status
+    except urllib.error.HTTPError as e:
+        e.read()
+        status = e.code
+    except Exception:
+        status = None
+    return status, (time.perf_counter() - start) * 1000
+
+
+def percentile(samples, q):
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return round(ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))], 2)
+
+
+def run_level(base_url, payloads, endpoints, concurrency, requests, timeout):
+    jobs = [(ep, payloads.make(ep)) for ep in endpoints for _ in range(requests)]
+    payloads.rng.shuffle(jobs)
+    outcomes = {ep: {"latencies": [], "ok": 0, "rejected": 0, "failed": 0} for ep in endpoints}
+    lock = threading.Lock()
+
+    def one(job):
+        endpoint, payload = job
+        status, ms = post(f"{base_url}/v1/{endpoint}", payload, timeout)
+        with lock:
+            out = outcomes[endpoint]
+            if status == 200:
+                out["ok"] += 1
+                out["latencies"].append(ms)
+            elif status == 429:
+                out["rejected"] += 1
+            else:
+                out["failed"] += 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        list(pool.map(one, jobs))
+    elapsed = time.perf_counter() - start
+
+    level = {"concurrency": concurrency, "elapsed_sec": round(elapsed, 2), "endpoints": {}}
+    for endpoint, out in outcomes.items():
+        lat = out["latencies"]
+        level["endpoints"][endpoint] = {
+            "ok": out["ok"], "rejected": out["rejected"], "failed": out["failed"],
+            "items_per_sec": round(out["ok"] * payloads.batch / elapsed, 1),
+            "p50_ms": percentile(lat, 50), "p95_ms": percentile(lat, 95), "p99_ms": percentile(lat, 99),
+            "mean_ms": round(statistics.mean(lat), 2) if lat else None,
+        }
+    return level
+
+
+# ---------------- IN-PROCESS SERVER ----------------
+def start_local_server(clip_processes, io_threads):
+    import api_server
+    workdir = tempfile.mkdtemp(prefix="travelsmart-api-")
+    for name in ("landmarks.csv", "hotspots.csv", "recommend.csv", "landmarks.json"):
+        shutil.copy(os.path.join(fakes.ROOT, name), workdir)
+    os.chdir(workdir)
+    service = api_server.Service(clip_processes, io_threads, detector_loader=fakes.load_fake_detector)
+    service.warm_up()
+    server = api_server.make_server(service, "127.0.0.1", 0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    def stop():
+        server.shutdown()
+        server.server_close()
+        service.shutdown()
+        shutil.rmtree(workdir, ignore_errors=True)
+    return f"http://127.0.0.1:{server.server_port}", stop
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="existing server (default: start one in-process with stand-ins)")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=50, help="requests per endpoint per level")
+    parser.add_argument("--batch", type=int, default=8, help="items per request")
+    parser.add_argument("--only", nargs="+", choices=ENDPOINTS)
+    parser.add_argument("--clip-processes", type=int, default=2)
+    parser.add_argument("--io-threads", type=int, default=16)
+    parser.add_argument("--standin-latency", type=float, default=0.0)
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--out", default="load_api.json")
+    args = parser.parse_args()
+    out_path = os.path.abspath(args.out)
+
+    endpoints = args.only or ENDPOINTS
+    payloads = Payloads(args.batch)
+    stop = None
+    if args.url:
+        base_url = args.url.rstrip("/")
+    else:
+        fakes.api_clients.STANDIN_LATENCY = args.standin_latency
+        base_url, stop = start_local_server(args.clip_processes, args.io_threads)
+        post(f"{base_url}/v1/detect", payloads.make("detect"), args.timeout)  # wait for the models to load
+
+    levels = []
+    try:
+        for concurrency in args.concurrency:
+            level = run_level(base_url, payloads, endpoints, concurrency, args.requests, args.timeout)
+            levels.append(level)
+            for endpoint, r in level["endpoints"].items():
+                print(f"c={concurrency:<4d} {endpoint:16s} {r['items_per_sec']:9.1f} items/s  "
+                      f"p50 {r['p50_ms']}  p95 {r['p95_ms']}  p99 {r['p99_ms']} ms  "
+                      f"ok {r['ok']}  429 {r['rejected']}  failed {r['failed']}", file=sys.stderr)
+    finally:
+        if stop:
+            stop()
+
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump({"url": args.url or "in-process", "batch": args.batch, "levels": levels}, f, indent=2)
+    print(f"wrote {out_path}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
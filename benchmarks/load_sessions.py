@@ -0,0 +1,163 @@
+"""Headless load test: N simulated Streamlit sessions clicking through app1.py's pages.
+
+Each session is a streamlit.testing AppTest driving the sidebar radio through every
+page, with all outbound services replaced by the offline stand-ins. After each
+session count the harness records process RSS, thread count, open file handles
+and p50/p95/p99 latency of the reruns that succeeded (failed ones are counted
+separately under "errors"), which shows both per-session leaks (threads or
+memory that grow with N and never come back) and where latency falls over.
+
+AppTest is not thread-safe, so sessions are interleaved page by page in one
+process (like one Streamlit worker serving them in turn) rather than run in parallel.
+
+    python benchmarks/load_sessions.py [--sessions 1 5 10 25 50] [--rounds 2] [--out load_results.json]
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import threading
+import statistics
+
+import fakes
+
+APP = os.path.join(fakes.ROOT, "app1.py")
+PAGES = [
+    "🏠 Home",
+    "🤖 Smart Tour Guide",
+    "📍 Landmark Lens",
+    "🌐 Voice-to-Voice Translator",
+    "🛡️ Safe Route Planner",
+    "✨ TravelSmart Recommendations",
+]
+
+
+# ---------------- PROCESS STATS ----------------
+def rss_mb():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        import resource  # peak rather than current RSS where /proc is unavailable
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def thread_count():
+    """OS-level threads (includes native ones such as torch/PyAudio workers)."""
+    try:
+        return len(os.listdir("/proc/self/task"))
+    except OSError:
+        return threading.active_count()
+
+
+def open_files():
+    try:
+        return len(os.listdir("/proc/self/fd"))
+    except OSError:
+        return None
+
+
+def percentile(samples, q):
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+
+# ---------------- SESSIONS ----------------
+def new_session(timeout):
+    from streamlit.testing.v1 import AppTest
+    at = AppTest.from_file(APP, default_timeout=timeout)
+    at.run()
+    return at
+
+
+def rerun(at, page, latencies, errors):
+    """One page switch; only reruns that completed without an exception are timed."""
+    start = time.perf_counter()
+    try:
+        at.sidebar.radio[0].set_value(page).run()
+    except Exception as e:
+        errors.append(f"{page}: {type(e).__name__}: {e}")
+        return
+    if at.exception:
+        errors.append(f"{page}: {at.exception[0].message}")
+        return
+    latencies.append((time.perf_counter() - start) * 1000)
+
+
+def run_level(sessions, n, rounds, timeout):
+    """Grow `sessions` to `n`, move every session through every page, and return the stats."""
+    while len(sessions) < n:
+        sessions.append(new_session(timeout))
+
+    latencies, errors = [], []
+    for _ in range(rounds):
+        for page in PAGES:
+            for at in sessions:
+                rerun(at, page, latencies, errors)
+
+    return {
+        "sessions": n,
+        "reruns": len(latencies) + len(errors),
+        "ok": len(latencies),
+        "rss_mb": round(rss_mb(), 1),
+        "threads": thread_count(),
+        "open_files": open_files(),
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+        "mean_ms": statistics.mean(latencies) if latencies else None,
+        "errors": len(errors),
+        "first_errors": sorted(set(errors))[:5],
+    }
+
+
+def _summary(level):
+    if not level["ok"]:
+        return f"all {level['reruns']} reruns failed"
+    return (f"p50 {level['p50_ms']:7.1f}  p95 {level['p95_ms']:7.1f}  p99 {level['p99_ms']:7.1f} ms "
+            f"over {level['ok']} ok reruns")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 5, 10, 25, 50])
+    parser.add_argument("--rounds", type=int, default=2, help="passes over all pages per session per level")
+    parser.add_argument("--timeout", type=float, default=30, help="per-rerun timeout in seconds")
+    parser.add_argument("--standin-latency", type=float, default=0.0)
+    parser.add_argument("--out", default="load_results.json")
+    args = parser.parse_args()
+    out_path = os.path.abspath(args.out)
+
+    # Pages read and rewrite data files relative to the working directory
+    workdir = tempfile.mkdtemp(prefix="travelsmart-load-")
+    for name in os.listdir(fakes.ROOT):
+        if name.endswith((".csv", ".json", ".jpg")):
+            shutil.copy(os.path.join(fakes.ROOT, name), workdir)
+    os.environ.setdefault("TRAVELSMART_TM_PATH", os.path.join(workdir, "translation_memory.db"))
+    os.chdir(workdir)
+    fakes.api_clients.STANDIN_LATENCY = args.standin_latency
+
+    baseline = {"rss_mb": round(rss_mb(), 1), "threads": thread_count(), "open_files": open_files()}
+    print(f"baseline  rss {baseline['rss_mb']} MB  threads {baseline['threads']}  files {baseline['open_files']}",
+          file=sys.stderr)
+
+    sessions, levels = [], []
+    for n in sorted(args.sessions):
+        level = run_level(sessions, n, args.rounds, args.timeout)
+        levels.append(level)
+        print(f"{n:4d} sessions  rss {level['rss_mb']:8.1f} MB  threads {level['threads']:4d}  "
+              f"files {level['open_files']}  {_summary(level)}  errors {level['errors']}", file=sys.stderr)
+
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump({"baseline": baseline, "levels": levels, "rounds": args.rounds}, f, indent=2)
+    shutil.rmtree(workdir, ignore_errors=True)
+    print(f"wrote {out_path}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
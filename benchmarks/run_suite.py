@@ -0,0 +1,360 @@
+"""Offline benchmark suite for every feature page, using the stand-ins in fakes.py.
+
+    python benchmarks/run_suite.py [--sizes 1000 10000 100000] [--only map_html ...] [--out bench_results.json]
+    python benchmarks/run_suite.py --compare old.json new.json
+
+Results are written as JSON (one entry per benchmark x size) so two runs can be
+diffed with --compare. A benchmark whose page module can't be imported (e.g. torch
+or streamlit missing) is recorded as skipped with the reason.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import statistics
+import subprocess
+from queue import Queue
+from threading import Thread
+
+import fakes  # noqa: F401  (switches api_clients to offline stand-ins)
+import api_clients
+
+BENCHMARKS = {}
+
+
+def benchmark(name, sizes_arg="sizes"):
+    def register(fn):
+        BENCHMARKS[name] = (fn, sizes_arg)
+        return fn
+    return register
+
+
+def timed(fn, repeat=3):
+    """Median wall time of `fn()` in ms over `repeat` runs, plus its last return value."""
+    samples, result = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), result
+
+
+# ---------------- BENCHMARKS ----------------
+@benchmark("map_html")
+def bench_map_html(size, repeat):
+    import maplegend
+    tourist_df, hotspot_df = fakes.make_landmarks(size), fakes.make_hotspots(size)
+    # Cold: new data version, so the static page is rebuilt. Warm: a rerun that only
+    # splices in the session's map centre.
+    build_ms, template = timed(lambda: maplegend.build_map_template(tourist_df, hotspot_df), repeat)
+    ms, html = timed(lambda: maplegend.render_map_page(template, 13.0827, 80.2707), repeat)
+    return {"median_ms": ms, "build_ms": build_ms, "html_bytes": len(html.encode("utf-8"))}
+
+
+@benchmark("recommend_lookup")
+def bench_recommend_lookup(size, repeat, lookups=100):
+    import recommendapp
+    df = fakes.make_recommendations(size)
+    states = list(df["State/UT"].iloc[:: max(1, size // lookups)])[:lookups]
+    ms, _ = timed(lambda: [recommendapp.find_state_row(df, s) for s in states], repeat)
+    return {"median_ms": ms, "per_lookup_ms": ms / len(states)}
+
+
+@benchmark("clip_worker", sizes_arg="clip_sizes")
+def bench_clip_worker(size, repeat, frames=50):
+    import cv2
+    import torch
+    from PIL import Image
+    import finalhistoryapp
+
+    model = fakes.FakeClipModel()
+    text_embeddings = model.encode_text_embeddings(size)
+    names = [f"Landmark {i}" for i in range(size)]
+
+    def run():
+        in_q, out_q = Queue(), Queue()
+        worker = Thread(target=finalhistoryapp.clip_worker,
+                        args=(in_q, out_q, model, model.preprocess, text_embeddings, names, "cpu"), daemon=True)
+        worker.start()
+        cap = fakes.SyntheticCapture(frames=frames)
+        while True:
+            ok, frame = cap.read()
+            if not ok:
+                break
+            in_q.put(Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)))
+        in_q.put(None)
+        worker.join()
+        return out_q.qsize()
+
+    with torch.no_grad():
+        ms, done = timed(run, repeat)
+    return {"median_ms": ms, "frames": done, "frames_per_sec": done / (ms / 1000) if ms else None}
+
+
+@benchmark("photo_cache", sizes_arg="query_sizes")
+def bench_photo_cache(size, repeat, distinct=20):
+    import io
+    import random
+    import numpy as np
+    from PIL import Image
+    import finalhistoryapp
+    import phash_cache
+
+    model = fakes.FakeClipModel()
+    names = [f"Landmark {i}" for i in range(65)]
+    text_embeddings = model.encode_text_embeddings(len(names))
+    rng = random.Random(3)
+    originals = [Image.fromarray(np.random.default_rng(i).integers(0, 256, (240, 320, 3), dtype=np.uint8))
+                 .resize((640, 480), Image.BILINEAR) for i in range(distinct)]
+
+    def near_duplicate(img):
+        # the same photo re-shared: re-encoded at a random JPEG quality and size
+        scale = rng.uniform(0.5, 1.0)
+        buf = io.BytesIO()
+        img.resize((int(img.width * scale), int(img.height * scale))).save(buf, "JPEG", quality=rng.randint(50, 90))
+        return Image.open(buf).convert("RGB")
+
+    # Popular photos arrive far more often than the rest (Zipf-like)
+    weights = [1 / (i + 1) for i in range(distinct)]
+    uploads = [near_duplicate(originals[rng.choices(range(distinct), weights)[0]]) for _ in range(size)]
+
+    def uncached():
+        return [finalhistoryapp.clip_top_k(model, model.preprocess, [img], text_embeddings, names, "cpu", 3)[0]
+                for img in uploads]
+
+    def cached():
+        cache = phash_cache.PerceptualCache()
+        tops = [finalhistoryapp.cached_top_k(model, model.preprocess, [img], text_embeddings, names, "cpu",
+                                             cache, 3)[0] for img in uploads]
+        return tops, cache.stats()
+
+    base_ms, expected = timed(uncached, repeat)
+    ms, (tops, stats) = timed(cached, repeat)
+    agree = sum(a[0][0] == b[0][0] for a, b in zip(expected, tops)) / size
+    return {"median_ms": ms, "uncached_ms": base_ms, "hit_rate": stats["hit_rate"],
+            "saved_inference_ms": stats["saved_sec"] * 1000, "top1_agreement": agree}
+
+
+@benchmark("place_info_cache", sizes_arg="query_sizes")
+def bench_place_info_cache(size, repeat):
+    import chatbot2
+    chatbot2.get_place_info.clear()
+    places = [f"Landmark {i}" for i in range(size)]
+    cold_ms, _ = timed(lambda: [chatbot2.get_place_info(p, "English") for p in places], repeat=1)
+    warm_ms, _ = timed(lambda: [chatbot2.get_place_info(p, "English") for p in places], repeat)
+    return {"median_ms": warm_ms, "cold_per_call_ms": cold_ms / size, "warm_per_call_ms": warm_ms / size}
+
+
+# Follow-up questions a tourist might ask; the first group is usually answerable
+# from landmarks.json, the second always needs the LLM.
+DOUBT_TEMPLATES = [
+    "When was {} built?", "Who built {}?", "Where is {}?", "What is {} famous for?",
+    "What are the opening hours of {}?", "How much is the entry ticket for {}?",
+    "Is photography allowed inside {}?", "What food should I try near {}?",
+]
+
+
+@benchmark("doubt_answer", sizes_arg="query_sizes")
+def bench_doubt_answer(size, repeat):
+    import json
+    import random
+    import chatbot2
+    import knowledge
+
+    with open("landmarks.json", encoding="utf-8") as f:
+        places = list(json.load(f))
+    rng = random.Random(4)
+    questions = [(p, rng.choice(DOUBT_TEMPLATES).format(p)) for p in (rng.choice(places) for _ in range(size))]
+
+    def run(enabled):
+        knowledge.ENABLED = enabled
+        path = os.path.abspath(f"knowledge_{size}_{enabled}.db")  # fresh: no answers from earlier runs
+        if os.path.exists(path):
+            os.remove(path)
+        knowledge._kb = knowledge.KnowledgeBase(path)
+        chatbot2.get_doubt_answer.clear()
+        before = api_clients.client_stats().get("gemini", {}).get("calls", 0)
+        start = time.perf_counter()
+        for place, question in questions:
+            chatbot2.get_doubt_answer(place, question, "English")
+        ms = (time.perf_counter() - start) * 1000
+        return ms, api_clients.client_stats()["gemini"]["calls"] - before
+
+    try:
+        base_ms, base_calls = run(False)
+        ms, calls = run(True)
+    finally:
+        knowledge.ENABLED = True
+    return {"median_ms": ms, "per_question_ms": ms / size, "llm_call_rate": calls / size,
+            "all_llm_ms": base_ms, "all_llm_call_rate": base_calls / size}
+
+
+@benchmark("translator_round_trip", sizes_arg="query_sizes")
+def bench_translator_round_trip(size, repeat):
+    import translator
+    import voice_stream
+    phrases = [f"where is landmark {i % 20}" for i in range(size)]  # repeats exercise the memory
+    recognizer = voice_stream.ScriptedRecognizer(phrases)
+    audio_path = os.path.join(tempfile.gettempdir(), "bench_translator.mp3")
+
+    def run():
+        for _ in phrases:
+            text = recognizer(b"")
+            translated = translator.translate_for(text, "hi")
+            api_clients.synthesize(translated, "hi", audio_path)
+
+    ms, _ = timed(run, repeat)
+    return {"median_ms": ms, "per_utterance_ms": ms / size}
+
+
+@benchmark("dataset_load")
+def bench_dataset_load(size, repeat):
+    import pandas as pd
+    import datasets
+    path = os.path.abspath(f"hotspots_{size}.csv")
+    fakes.make_hotspots(size).to_csv(path, index=False)
+    csv_ms, _ = timed(lambda: pd.read_csv(path), repeat)
+    compile_ms, _ = timed(lambda: datasets.compile_source("hotspots", path), repeat=1)
+
+    def open_compiled():
+        datasets._loaded.clear()
+        return datasets.load("hotspots", path)
+
+    open_ms, ds = timed(open_compiled, repeat)
+    warm_ms, _ = timed(lambda: datasets.load("hotspots", path)["lat"], repeat)
+    frame_ms, _ = timed(lambda: datasets.Dataset(ds.name, ds.columns, ds.fingerprint).to_frame(), repeat)
+    cache_dir = datasets._cache_dir("hotspots", path)
+    cache_bytes = sum(os.path.getsize(os.path.join(cache_dir, f)) for f in os.listdir(cache_dir))
+    return {"median_ms": open_ms, "read_csv_ms": csv_ms, "compile_ms": compile_ms, "warm_ms": warm_ms,
+            "frame_ms": frame_ms, "csv_kb": round(os.path.getsize(path) / 1024, 1),
+            "cache_kb": round(cache_bytes / 1024, 1), "rows": len(ds)}
+
+
+@benchmark("geo_query")
+def bench_geo_query(size, repeat, queries=500):
+    import numpy as np
+    import geo_index
+    hotspots = fakes.make_hotspots(size)
+    build_ms, index = timed(lambda: geo_index.GeoIndex(hotspots["lat"], hotspots["lng"]), repeat=1)
+    rng = np.random.default_rng(2)
+    points = np.column_stack([rng.uniform(*fakes.LAT_RANGE, queries), rng.uniform(*fakes.LNG_RANGE, queries)])
+    knn_ms, _ = timed(lambda: [index.knn(lat, lng, 10) for lat, lng in points], repeat)
+    radius_ms, _ = timed(lambda: [index.radius(lat, lng, 2.0) for lat, lng in points], repeat)
+    batch_ms, _ = timed(lambda: index.knn_batch(points[:, 0], points[:, 1], 10), repeat)
+    return {"median_ms": knn_ms / queries, "build_ms": build_ms, "knn10_ms": knn_ms / queries,
+            "radius2km_ms": radius_ms / queries, "knn10_batch_per_point_ms": batch_ms / queries}
+
+
+@benchmark("risk_tick")
+def bench_risk_tick(size, repeat, cities=None):
+    import risk_engine
+    hotspots = fakes.make_hotspots(size, cities=cities)
+    build_ms, engine = timed(lambda: risk_engine.RiskEngine(
+        hotspots["lat"], hotspots["lng"], hotspots["risk_level"], hotspots["crime_type"], seed=0), repeat=1)
+    tick_ms, _ = timed(lambda: engine.step(hour=21), repeat)
+    return {"median_ms": tick_ms, "build_ms": build_ms, "neighbour_links": len(engine.rows)}
+
+
+@benchmark("risk_tick_city")
+def bench_risk_tick_city(size, repeat):
+    # the same hotspots packed into 200 cities: neighbour search must not grow with density
+    return bench_risk_tick(size, repeat, cities=200)
+
+
+# ---------------- RUNNER ----------------
+def git_version():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=fakes.ROOT,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except Exception:
+        return "unknown"
+
+
+def run(args):
+    # Pages read/write data files relative to the working directory; keep that off the repo
+    workdir = tempfile.mkdtemp(prefix="travelsmart-bench-")
+    for name in ("landmarks.csv", "hotspots.csv", "recommend.csv", "landmarks.json"):
+        shutil.copy(os.path.join(fakes.ROOT, name), workdir)
+    os.environ.setdefault("TRAVELSMART_TM_PATH", os.path.join(workdir, "translation_memory.db"))
+    os.chdir(workdir)
+    api_clients.STANDIN_LATENCY = args.standin_latency
+
+    results = []
+    for name, (fn, sizes_arg) in BENCHMARKS.items():
+        if args.only and name not in args.only:
+            continue
+        for size in getattr(args, sizes_arg):
+            entry = {"name": name, "size": size}
+            try:
+                entry.update(fn(size, args.repeat))
+            except ImportError as e:
+                entry["skipped"] = f"missing dependency: {e}"
+            except Exception as e:
+                entry["error"] = f"{type(e).__name__}: {e}"
+            results.append(entry)
+            print(_format(entry), file=sys.stderr)
+
+    shutil.rmtree(workdir, ignore_errors=True)
+    return {
+        "version": git_version(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "standin_latency_sec": args.standin_latency,
+        "results": results,
+    }
+
+
+def _format(entry):
+    if "median_ms" in entry:
+        return f"{entry['name']:24s} {entry['size']:>9,}  {entry['median_ms']:10.1f} ms"
+    return f"{entry['name']:24s} {entry['size']:>9,}  {entry.get('skipped') or entry.get('error')}"
+
+
+def compare(old_path, new_path):
+    with open(old_path, encoding="utf-8") as f:
+        old = {(r["name"], r["size"]): r for r in json.load(f)["results"]}
+    with open(new_path, encoding="utf-8") as f:
+        new = json.load(f)["results"]
+    print(f"{'benchmark':24s} {'size':>9s}  {'old ms':>10s} {'new ms':>10s}  change")
+    for r in new:
+        before = old.get((r["name"], r["size"]), {})
+        if "median_ms" not in r or "median_ms" not in before:
+            continue
+        change = (r["median_ms"] - before["median_ms"]) / before["median_ms"] * 100 if before["median_ms"] else 0.0
+        print(f"{r['name']:24s} {r['size']:>9,}  {before['median_ms']:10.1f} {r['median_ms']:10.1f}  {change:+6.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000],
+                        help="landmark/hotspot/row counts (add 1000000 for national scale)")
+    parser.add_argument("--clip-sizes", type=int, nargs="+", default=[65, 10000],
+                        help="number of landmark text embeddings for clip_worker")
+    parser.add_argument("--query-sizes", type=int, nargs="+", default=[100],
+                        help="number of queries for the tour guide and translator benchmarks")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--standin-latency", type=float, default=0.0,
+                        help="simulated service latency in seconds (0 measures only our own code)")
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS))
+    parser.add_argument("--out", default="bench_results.json")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"))
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    out_path = os.path.abspath(args.out)
+    report = run(args)
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"wrote {out_path}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,12 @@
 import streamlit as st
 import google.generativeai as genai
 import speech_recognition as sr
-from gtts import gTTS
-from langdetect import detect
-from deep_translator import GoogleTranslator
+
+import api_clients
+import knowledge
+import metrics
+import voice_stream
+from tour_pipeline import run_place_query, run_doubt_query
 
 import re
 
@@ -55,8 +58,8 @@ def clean_text_for_audio(text):
     return text.strip()
 
 # ---------------- CACHED GEMINI CALL ----------------
-@st.cache_data
-def get_place_info(place, lang):
+def place_info(place, lang):
+    """Gemini's tour-guide description of `place`; raises ServiceUnavailable."""
     prompt = f"""
     Imagine you are a lively tourist guide explaining {place}.
     Reply in {lang}. Keep it simple, fun, and engaging.
@@ -68,24 +71,39 @@ def get_place_info(place, lang):
 
     Avoid reading emojis in audio. Make it informative and enjoyable.
     """
+    return api_clients.generate(model, prompt)
+
+@st.cache_data
+def get_place_info(place, lang):
     try:
-        response = model.generate_content(prompt)
-        return response.text
-    except Exception as e:
+        return place_info(place, lang)
+    except api_clients.ServiceUnavailable as e:
         return f"⚠ Error fetching Gemini response: {e}"
 
 @st.cache_data
 def get_doubt_answer(place, doubt, lang):
-    prompt = f"""
+    # Simple factual doubts are answered from local knowledge; the rest go to
+    # Gemini with the most relevant local passages as notes.
+    def ask_gemini(notes):
+        prompt = f"""
     You are guiding a tourist about {place}.
     They asked: "{doubt}".
     Reply in {lang}, keep it clear, detailed, and friendly.
     Add 1 fun fact or travel tip if relevant. Avoid emojis for audio.
     """
+        if notes:
+            prompt += f"""
+    Notes that may help (use only if relevant):
+{notes}
+    """
+        return api_clients.generate(model, prompt)
+
+    def translate(text):
+        return api_clients.translate(text, target=languages.get(lang, "en"), source="en")
+
     try:
-        response = model.generate_content(prompt)
-        return response.text
-    except Exception as e:
+        return knowledge.get_knowledge().answer(place, doubt, lang, ask_gemini, translate)
+    except api_clients.ServiceUnavailable as e:
         return f"⚠ Error fetching Gemini response: {e}"
 
 # ---------------- MAIN FUNCTION ----------------
@@ -122,33 +140,25 @@ def ai_tour_guide():
     # ---------- VOICE INPUT ----------
     st.subheader("🎤 Speak a Place Name")
     if st.button("Start Listening"):
-        recognizer = sr.Recognizer()
-        mic = sr.Microphone()
-        with mic as source:
-            st.info("🎙 Listening... Please say the place name clearly.")
-            recognizer.adjust_for_ambient_noise(source)
-            audio = recognizer.listen(source)
-
+        st.info("🎙 Listening... Please say the place name clearly.")
         try:
-            spoken_text = recognizer.recognize_google(audio)
+            with metrics.span("tour.listen"):
+                spoken_text = voice_stream.listen_once()
+            if not spoken_text:
+                raise sr.UnknownValueError("no speech recognized")
             st.success(f"✅ You said: {spoken_text}")
 
-            # Translate to English if needed for Gemini
-            input_lang = detect(spoken_text)
-            place_en = GoogleTranslator(source='auto', target='en').translate(spoken_text)
+            # Translate to English if needed (skipped for English input), then describe + speak
+            place_en, explanation, audio_file = run_place_query(
+                spoken_text, selected_lang, lang_code, get_place_info, clean_text_for_audio, "tour_guide.mp3"
+            )
 
             st.session_state.last_place = place_en
 
-            explanation = get_place_info(place_en, selected_lang)
-
             st.markdown(f"### 📖 Description")
             st.write(explanation)
-
-            # Clean text for TTS
-            clean_explanation = clean_text_for_audio(explanation)
-            tts = gTTS(text=clean_explanation, lang=lang_code)
-            tts.save("tour_guide.mp3")
-            st.audio("tour_guide.mp3", format="audio/mp3")
+            if audio_file:
+                st.audio(audio_file, format="audio/mp3")
 
         except Exception as e:
             st.error(f"⚠ Voice recognition error: {e}")
@@ -159,30 +169,23 @@ def ai_tour_guide():
         if not st.session_state.last_place:
             st.warning("⚠ First select a place before asking doubts.")
         else:
-            recognizer = sr.Recognizer()
-            mic = sr.Microphone()
-            with mic as source:
-                st.info("🎙 Listening for your doubt...")
-                recognizer.adjust_for_ambient_noise(source)
-                audio = recognizer.listen(source)
-
+            st.info("🎙 Listening for your doubt...")
             try:
-                doubt_text = recognizer.recognize_google(audio)
+                with metrics.span("tour.listen"):
+                    doubt_text = voice_stream.listen_once()
+                if not doubt_text:
+                    raise sr.UnknownValueError("no speech recognized")
                 st.success(f"✅ You asked: {doubt_text}")
 
-                input_lang = detect(doubt_text)
-                doubt_en = GoogleTranslator(source='auto', target='en').translate(doubt_text)
-
-
-                answer = get_doubt_answer(st.session_state.last_place, doubt_en, selected_lang)
+                doubt_en, answer, audio_file = run_doubt_query(
+                    st.session_state.last_place, doubt_text, selected_lang, lang_code,
+                    get_doubt_answer, clean_text_for_audio, "doubt_answer.mp3"
+                )
 
                 st.markdown(f"### 💡 Answer")
                 st.write(answer)
-
-                clean_answer = clean_text_for_audio(answer)
-                tts = gTTS(text=clean_answer, lang=lang_code)
-                tts.save("doubt_answer.mp3")
-                st.audio("doubt_answer.mp3", format="audio/mp3")
+                if audio_file:
+                    st.audio(audio_file, format="audio/mp3")
 
             except Exception as e:
                 st.error(f"⚠ Error while recognizing doubt: {e}")
@@ -192,20 +195,16 @@ def ai_tour_guide():
     place_text = st.text_input("Enter a place name:")
     if st.button("Submit Place"):
         if place_text.strip():
-            input_lang = detect(place_text)
-            place_en = GoogleTranslator(source='auto', target='en').translate(place_text)
+            place_en, explanation, audio_file = run_place_query(
+                place_text, selected_lang, lang_code, get_place_info, clean_text_for_audio, "tour_guide.mp3"
+            )
 
             st.session_state.last_place = place_en
 
-            explanation = get_place_info(place_en, selected_lang)
-
             st.markdown(f"### 📖 Description")
             st.write(explanation)
-
-            clean_explanation = clean_text_for_audio(explanation)
-            tts = gTTS(text=clean_explanation, lang=lang_code)
-            tts.save("tour_guide.mp3")
-            st.audio("tour_guide.mp3", format="audio/mp3")
+            if audio_file:
+                st.audio(audio_file, format="audio/mp3")
         else:
             st.warning("⚠ Please enter a place before submitting.")
 
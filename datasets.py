@@ -0,0 +1,271 @@
+import os
+import json
+import shutil
+import threading
+
+import numpy as np
+import pandas as pd
+
+# ---------------- COMPILED DATASETS ----------------
+# Each CSV/JSON source is validated once and compiled into .npy files per column
+# under .datacache/. Columns are then opened with mmap, so every session in the
+# process shares the same pages and a reload costs a stat() until the source changes.
+# Text columns are dictionary-encoded: int32 codes per row, and the distinct values
+# stored once as UTF-8 bytes plus offsets.
+
+CACHE_DIR_NAME = ".datacache"
+FORMAT_VERSION = 2
+
+
+class SchemaError(ValueError):
+    """A source file is missing columns or has values of the wrong type/range."""
+
+
+# column -> "str" | "float" | "int"; ranges are inclusive (min, max)
+SCHEMAS = {
+    "landmarks": {
+        "path": "landmarks.csv",
+        "columns": {"Category": "str", "Name": "str", "Lat": "float", "Lng": "float"},
+        "ranges": {"Lat": (-90, 90), "Lng": (-180, 180)},
+    },
+    "hotspots": {
+        "path": "hotspots.csv",
+        "columns": {"name": "str", "lat": "float", "lng": "float", "crime_type": "str", "notes": "str",
+                    "risk_level": "int", "base_risk": "int"},
+        # column may be absent or blank; a column name copies that (earlier) column.
+        # base_risk is the curated level the risk simulation decays toward; risk_level is live.
+        "defaults": {"risk_level": 3, "base_risk": "risk_level"},
+        "ranges": {"lat": (-90, 90), "lng": (-180, 180), "risk_level": (1, 5), "base_risk": (1, 5)},
+    },
+    "recommend": {
+        "path": "recommend.csv",
+        "columns": None,  # wide table of text; only the key column is required
+        "required": ["State/UT"],
+    },
+    "landmark_descriptions": {
+        "path": "landmarks.json",
+        "columns": {"name": "str", "description": "str"},
+    },
+}
+
+
+class StringColumn:
+    """Read-only text column: `codes` index into the distinct values held in `data`
+    (UTF-8) between consecutive `offsets`. Values are decoded only when accessed."""
+
+    def __init__(self, codes, offsets, data):
+        self.codes = codes
+        self.offsets = offsets
+        self.data = data
+        self._categories = None
+
+    @classmethod
+    def from_values(cls, values):
+        codes, uniques = pd.factorize(pd.Series(values, dtype=object), use_na_sentinel=False)
+        encoded = [str(u).encode("utf-8") for u in uniques]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(b) for b in encoded], out=offsets[1:])
+        data = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+        return cls(codes.astype(np.int32), offsets, data)
+
+    @property
+    def categories(self):
+        """The distinct values, decoded once per process."""
+        if self._categories is None:
+            raw, bounds = self.data.tobytes(), self.offsets.tolist()
+            self._categories = [raw[a:b].decode("utf-8") for a, b in zip(bounds[:-1], bounds[1:])]
+        return self._categories
+
+    def _decode(self, code):
+        if self._categories is not None:
+            return self._categories[code]
+        return self.data[self.offsets[code]:self.offsets[code + 1]].tobytes().decode("utf-8")
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, i):
+        if isinstance(i, (int, np.integer)):
+            return self._decode(int(self.codes[i]))
+        return np.asarray(self.categories, dtype=object)[self.codes[i]]
+
+    def __iter__(self):
+        categories = self.categories
+        return (categories[c] for c in self.codes.tolist())
+
+    def __array__(self, dtype=None, copy=None):
+        values = np.asarray(self.categories, dtype=object)[np.asarray(self.codes)]
+        return values if dtype is None else values.astype(dtype)
+
+    def tolist(self):
+        return list(self)
+
+    def to_categorical(self):
+        return pd.Categorical.from_codes(self.codes, pd.Index(self.categories, dtype=object))
+
+
+class Dataset:
+    """Read-only columns of one compiled source (memory-mapped NumPy arrays; text
+    columns as StringColumn)."""
+
+    def __init__(self, name, columns, fingerprint):
+        self.name = name
+        self.columns = columns
+        self.fingerprint = fingerprint
+        self._frame = None
+
+    def __len__(self):
+        return len(next(iter(self.columns.values()))) if self.columns else 0
+
+    def __getitem__(self, column):
+        return self.columns[column]
+
+    def to_frame(self):
+        """Shared pandas DataFrame of the columns, built once per process. Don't mutate it.
+
+        Text columns become categoricals over the stored codes, so only the distinct
+        values are turned into Python strings.
+        """
+        if self._frame is None:
+            self._frame = pd.DataFrame({
+                col: arr.to_categorical() if isinstance(arr, StringColumn) else arr
+                for col, arr in self.columns.items()
+            })
+        return self._frame
+
+
+# ---------------- VALIDATION ----------------
+def _read_source(name, path):
+    if path.endswith(".json"):
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if not isinstance(data, dict):
+            raise SchemaError(f"{path}: expected an object of name -> description")
+        return pd.DataFrame({"name": list(data.keys()), "description": [str(v) for v in data.values()]})
+    return pd.read_csv(path)
+
+
+def validate(name, df, path="<frame>"):
+    """Check `df` against SCHEMAS[name] and return {column: NumPy array or StringColumn}."""
+    schema = SCHEMAS[name]
+    columns = schema["columns"]
+    if columns is None:
+        missing = [c for c in schema.get("required", []) if c not in df.columns]
+        if missing:
+            raise SchemaError(f"{path}: missing columns {missing}")
+        columns = {c: "str" for c in df.columns}
+
+    defaults = schema.get("defaults", {})
+    missing = [c for c in columns if c not in df.columns and c not in defaults]
+    if missing:
+        raise SchemaError(f"{path}: missing columns {missing}")
+
+    out = {}
+    for col, kind in columns.items():
+        series = df[col] if col in df.columns else pd.Series([None] * len(df), dtype=object)
+        if kind == "str":
+            out[col] = StringColumn.from_values(series.fillna("").astype(str))
+            continue
+        values = pd.to_numeric(series, errors="coerce")
+        if col in defaults:
+            default = defaults[col]
+            values = values.fillna(pd.Series(out[default], index=values.index) if isinstance(default, str) else default)
+        bad = values.isna()
+        if bad.any():
+            rows = list(bad[bad].index[:5])
+            raise SchemaError(f"{path}: column {col!r} has non-numeric values (rows {rows})")
+        lo, hi = schema.get("ranges", {}).get(col, (None, None))
+        if lo is not None and ((values < lo) | (values > hi)).any():
+            raise SchemaError(f"{path}: column {col!r} outside {lo}..{hi}")
+        out[col] = values.to_numpy(dtype=np.float64 if kind == "float" else np.int8)
+    return out
+
+
+# ---------------- COMPILE / LOAD ----------------
+def _fingerprint(path):
+    st = os.stat(path)
+    return f"v{FORMAT_VERSION}-{st.st_size}-{st.st_mtime_ns}"
+
+
+def _cache_dir(name, path):
+    return os.path.join(os.path.dirname(os.path.abspath(path)), CACHE_DIR_NAME, name)
+
+
+def compile_source(name, path=None):
+    """Validate `path` and write its columns to .datacache/<name>/; returns the cache dir."""
+    path = path or SCHEMAS[name]["path"]
+    fingerprint = _fingerprint(path)
+    columns = validate(name, _read_source(name, path), path)
+
+    target = _cache_dir(name, path)
+    tmp = f"{target}.tmp-{os.getpid()}-{threading.get_ident()}"
+    os.makedirs(tmp, exist_ok=True)
+    order = list(columns)
+    strings = [col for col in order if isinstance(columns[col], StringColumn)]
+    for i, col in enumerate(order):
+        values = columns[col]
+        if col in strings:
+            for part in ("codes", "offsets", "data"):
+                np.save(os.path.join(tmp, f"{i}.{part}.npy"), getattr(values, part), allow_pickle=False)
+        else:
+            np.save(os.path.join(tmp, f"{i}.npy"), values, allow_pickle=False)
+    with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump({"source": os.path.basename(path), "fingerprint": fingerprint, "columns": order,
+                   "strings": strings}, f)
+    old = f"{target}.old-{os.getpid()}-{threading.get_ident()}"
+    if os.path.exists(target):
+        os.replace(target, old)
+    os.replace(tmp, target)
+    shutil.rmtree(old, ignore_errors=True)
+    return target
+
+
+def _open_compiled(name, path, fingerprint):
+    target = _cache_dir(name, path)
+    try:
+        with open(os.path.join(target, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if meta.get("fingerprint") != fingerprint:
+        return None
+    def open_npy(filename):
+        return np.load(os.path.join(target, filename), mmap_mode="r", allow_pickle=False)
+
+    strings = set(meta.get("strings", []))
+    columns = {
+        col: StringColumn(*(open_npy(f"{i}.{part}.npy") for part in ("codes", "offsets", "data")))
+        if col in strings else open_npy(f"{i}.npy")
+        for i, col in enumerate(meta["columns"])
+    }
+    return Dataset(name, columns, fingerprint)
+
+
+_loaded = {}
+_lock = threading.Lock()
+
+
+def load(name, path=None):
+    """Process-wide, validated dataset for `name`; recompiled when the source file changes."""
+    path = path or SCHEMAS[name]["path"]
+    key = (name, os.path.abspath(path))
+    fingerprint = _fingerprint(path)
+    ds = _loaded.get(key)
+    if ds is not None and ds.fingerprint == fingerprint:
+        return ds
+    with _lock:
+        ds = _loaded.get(key)
+        if ds is not None and ds.fingerprint == fingerprint:
+            return ds
+        ds = _open_compiled(name, path, fingerprint)
+        if ds is None:
+            compile_source(name, path)
+            ds = _open_compiled(name, path, fingerprint)
+            if ds is None:  # source changed while compiling; read it directly this time
+                ds = Dataset(name, validate(name, _read_source(name, path), path), fingerprint)
+        _loaded[key] = ds
+        return ds
+
+
+def load_frame(name, path=None):
+    return load(name, path).to_frame()
@@ -1,5 +1,4 @@
 import time
-import json
 import textwrap
 from threading import Thread
 from queue import Queue, Empty
@@ -8,23 +7,29 @@ import torch
 import clip
 from PIL import Image
 import cv2
-import wikipedia
 import streamlit as st
 
+import api_clients
+import datasets
+import knowledge
+import metrics
+import phash_cache
+
 # ---------- CONFIG ----------
 LANDMARKS_JSON = "landmarks.json"   # path to your JSON file
 MODEL_NAME = "ViT-B/32"             # CLIP model
 DEVICE = "cuda" if torch.cuda.is_available() else "cpu"
 THROTTLE_SEC = 2.0                  # seconds between CLIP inferences
 SIMILARITY_THRESHOLD = 22.0         # higher threshold = stricter detection
+CACHE_TOP_K = 5                     # matches kept per cached photo
+PHOTO_TYPES = ["jpg", "jpeg", "png", "webp"]
 FONT = cv2.FONT_HERSHEY_SIMPLEX
 # ----------------------------
 
 def load_landmarks(path):
-    with open(path, "r", encoding="utf-8") as f:
-        data = json.load(f)
-    names = list(data.keys())
-    descs = data  # dict name->desc
+    ds = datasets.load("landmark_descriptions", path)
+    names = ds["name"].tolist()
+    descs = dict(zip(names, ds["description"].tolist()))  # dict name->desc
     return names, descs
 
 def wrap_text(text, width=40):
@@ -37,6 +42,78 @@ def overlay_multiline_text(frame, text, x, y, line_height=20, font_scale=0.6, th
         cv2.putText(frame, line, (x, y_pos), FONT, font_scale, (255,255,255), thickness+2, cv2.LINE_AA)
         cv2.putText(frame, line, (x, y_pos), FONT, font_scale, (0,120,180), thickness, cv2.LINE_AA)
 
+def load_clip(landmark_names, device=DEVICE):
+    """(model, preprocess, text_embeddings) for scoring images against `landmark_names`."""
+    with metrics.span("clip.load"):
+        model, preprocess = clip.load(MODEL_NAME, device=device)
+    model.eval()
+
+    with torch.no_grad(), metrics.span("clip.encode_text"):
+        text_tokens = clip.tokenize(landmark_names).to(device)
+        text_embeddings = model.encode_text(text_tokens)
+    return model, preprocess, text_embeddings
+
+def wiki_summary(name, landmark_descs):
+    """Short Wikipedia summary (falls back to the landmarks.json description).
+
+    Fetched summaries are kept in the knowledge base so tour guide doubts can use them.
+    """
+    fallback = landmark_descs.get(name, "")
+    summary = api_clients.wiki_summary(name, sentences=2, fallback=fallback)
+    if summary and summary != fallback:
+        knowledge.get_knowledge().remember(name, summary, "wikipedia")
+    return summary
+
+def encode_images(model, preprocess, images, device):
+    """Unit-length CLIP embeddings for a list of PIL images, encoded in one batch."""
+    image_input = torch.stack([preprocess(img) for img in images]).to(device)
+    with torch.no_grad(), metrics.span("clip.infer"):
+        image_emb = model.encode_image(image_input)
+        return image_emb / image_emb.norm(dim=-1, keepdim=True)
+
+def rank_landmarks(image_emb, text_embeddings, landmark_names, k=1):
+    """Best `k` (name, score) matches for each image embedding."""
+    with torch.no_grad():
+        text_emb_norm = text_embeddings / text_embeddings.norm(dim=-1, keepdim=True)
+        sims = 100.0 * image_emb @ text_emb_norm.T
+        top_val, top_idx = sims.topk(min(k, len(landmark_names)), dim=-1)
+    return [
+        [(landmark_names[i], score) for i, score in zip(idx_row, val_row)]
+        for idx_row, val_row in zip(top_idx.tolist(), top_val.tolist())
+    ]
+
+def clip_top_k(model, preprocess, images, text_embeddings, landmark_names, device, k=1):
+    """Best `k` (name, score) matches for each PIL image, scored in one batch."""
+    image_emb = encode_images(model, preprocess, images, device)
+    return rank_landmarks(image_emb, text_embeddings, landmark_names, k)
+
+def cached_top_k(model, preprocess, images, text_embeddings, landmark_names, device, cache, k=1):
+    """clip_top_k through a PerceptualCache: near-duplicates of earlier images skip the model.
+
+    Entries keep the image embedding and its CACHE_TOP_K matches, so a hit asking
+    for more matches is re-ranked from the embedding instead of re-encoded.
+    """
+    results, misses, keys = [None] * len(images), [], []
+    for i, img in enumerate(images):
+        entry, key = cache.get(img)
+        if entry is None:
+            misses.append(i)
+            keys.append(key)
+        elif len(entry["top"]) >= k:
+            results[i] = entry["top"][:k]
+        else:
+            results[i] = rank_landmarks(entry["embedding"][None].to(text_embeddings.device),
+                                        text_embeddings, landmark_names, k)[0]
+    if misses:
+        start = time.perf_counter()
+        image_emb = encode_images(model, preprocess, [images[i] for i in misses], device)
+        tops = rank_landmarks(image_emb, text_embeddings, landmark_names, max(k, CACHE_TOP_K))
+        cost = (time.perf_counter() - start) / len(misses)
+        for i, key, emb, top in zip(misses, keys, image_emb.cpu(), tops):
+            cache.put(key, {"embedding": emb, "top": top}, cost)
+            results[i] = top[:k]
+    return results
+
 def clip_worker(in_q: Queue, out_q: Queue, model, preprocess, text_embeddings, landmark_names, device):
     while True:
         item = in_q.get()
@@ -44,22 +121,74 @@ def clip_worker(in_q: Queue, out_q: Queue, model, preprocess, text_embeddings, l
             break
         pil_img = item
         try:
-            image_input = preprocess(pil_img).unsqueeze(0).to(device)
-            with torch.no_grad():
-                image_emb = model.encode_image(image_input)
-                image_emb = image_emb / image_emb.norm(dim=-1, keepdim=True)
-                text_emb_norm = text_embeddings / text_embeddings.norm(dim=-1, keepdim=True)
-                sims = (100.0 * image_emb @ text_emb_norm.T).squeeze(0)
-                top_val, top_idx = sims.topk(1)
-                score = top_val.item()
-                name = landmark_names[top_idx.item()]
-                out_q.put((name, score))
+            name, score = clip_top_k(model, preprocess, [pil_img], text_embeddings, landmark_names, device)[0][0]
+            out_q.put((name, score))
         except Exception:
             out_q.put((None, None))
 
+# One entry each: a landmarks.json edit replaces the model and cache instead of adding another
+@st.cache_resource(show_spinner="Loading CLIP model...", max_entries=1)
+def clip_resources(landmark_names):
+    return load_clip(list(landmark_names))
+
+@st.cache_resource(max_entries=1)
+def photo_cache(landmarks_version):
+    """Process-wide photo cache, shared by every session; a new one per landmark list version."""
+    return phash_cache.PerceptualCache()
+
+# ---------------- PHOTO UPLOAD ----------------
+def photo_upload_mode():
+    files = st.file_uploader("Upload one or more landmark photos", type=PHOTO_TYPES,
+                             accept_multiple_files=True)
+    if not files:
+        st.info("👆 Upload photos to identify the landmarks in them.")
+        return
+
+    landmark_names, landmark_descs = load_landmarks(LANDMARKS_JSON)
+    model, preprocess, text_embeddings = clip_resources(tuple(landmark_names))
+    cache = photo_cache(datasets.load("landmark_descriptions", LANDMARKS_JSON).fingerprint)
+
+    images, names = [], []
+    for f in files:
+        try:
+            images.append(Image.open(f).convert("RGB"))
+            names.append(f.name)
+        except Exception:
+            st.warning(f"⚠ Could not read {f.name}")
+    if not images:
+        return
+
+    before = cache.stats()
+    with metrics.span("clip.photos"):
+        results = cached_top_k(model, preprocess, images, text_embeddings, landmark_names, DEVICE, cache, k=3)
+    after = cache.stats()
+
+    for img, filename, top in zip(images, names, results):
+        col1, col2 = st.columns([1, 2])
+        col1.image(img, caption=filename)
+        best_name, best_score = top[0]
+        if best_score >= SIMILARITY_THRESHOLD:
+            col2.subheader(f"{best_name}  [{best_score:.1f}]")
+            col2.write(wiki_summary(best_name, landmark_descs))
+        else:
+            col2.warning("No landmark detected")
+        col2.caption("Candidates: " + ", ".join(f"{n} ({s:.1f})" for n, s in top))
+
+    hits = after["hits"] - before["hits"]
+    saved = after["saved_sec"] - before["saved_sec"]
+    st.caption(f"⚡ {hits}/{len(images)} photos answered from cache (~{saved * 1000:.0f} ms of inference saved). "
+               f"All sessions: {after['hit_rate']:.0%} hit rate, {after['saved_sec']:.1f} s saved, "
+               f"{after['entries']} cached photos.")
+
 # ---------------- FUNCTION ----------------
 def clip_landmark_detector():
     #st.title("🗺️ Live CLIP Landmark Detector")
+    mode = st.radio("Mode", ["📷 Live Webcam", "🖼 Upload Photos"], horizontal=True)
+    if mode == "🖼 Upload Photos":
+        st.markdown("Identify landmarks in your photos using CLIP.")
+        photo_upload_mode()
+        return
+
     st.markdown("Detect landmarks from webcam using CLIP + Streamlit.")
 
     start_button = st.button("Start Webcam")
@@ -73,13 +202,8 @@ def clip_landmark_detector():
     # Load landmarks data
     landmark_names, landmark_descs = load_landmarks(LANDMARKS_JSON)
 
-    # Load CLIP model
-    model, preprocess = clip.load(MODEL_NAME, device=DEVICE)
-    model.eval()
-
-    with torch.no_grad():
-        text_tokens = clip.tokenize(landmark_names).to(DEVICE)
-        text_embeddings = model.encode_text(text_tokens)
+    # CLIP model (shared with the photo path; loaded once per process)
+    model, preprocess, text_embeddings = clip_resources(tuple(landmark_names))
 
     in_q = Queue(maxsize=1)
     out_q = Queue(maxsize=1)
@@ -124,11 +248,7 @@ def clip_landmark_detector():
                     last_detected = detected_name
                     last_score = score
                     if show_wiki and detected_name not in wiki_cache:
-                        try:
-                            summary = wikipedia.summary(detected_name, sentences=2)
-                        except Exception:
-                            summary = landmark_descs.get(detected_name, "")
-                        wiki_cache[detected_name] = summary
+                        wiki_cache[detected_name] = wiki_summary(detected_name, landmark_descs)
                 else:
                     last_detected = None
                     last_score = score
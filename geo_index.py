@@ -0,0 +1,301 @@
+import math
+import threading
+
+import numpy as np
+
+import datasets
+
+# ---------------- GEOSPATIAL INDEX ----------------
+# Points are bucketed into a uniform lat/lng grid and stored sorted by cell, so the
+# cells of one grid row that a query touches are a single contiguous slice. Candidate
+# points from those slices are then filtered with a vectorized haversine.
+# Longitudes do not wrap at ±180°, which is fine for data inside India.
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEG_LAT = 111.32
+TARGET_PER_CELL = 32      # average points per occupied cell when picking the cell size
+KNN_LEVELS = 12           # nearest_neighbors starts with cells radius / sqrt(2)**12 wide
+KNN_SOURCE_BLOCK = 65536  # ... matches this many points at a time
+KNN_PAIR_BLOCK = 1 << 22  # ... generating at most this many candidate pairs at once
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    """Great-circle distance in km; any argument may be a NumPy array (broadcasts)."""
+    lat1, lng1, lat2, lng2 = (np.radians(np.asarray(v, dtype=np.float64)) for v in (lat1, lng1, lat2, lng2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+class GeoIndex:
+    def __init__(self, lats, lngs, cell_deg=None):
+        lats = np.asarray(lats, dtype=np.float64)
+        lngs = np.asarray(lngs, dtype=np.float64)
+        self.size = len(lats)
+        if self.size == 0:
+            self.min_lat = self.min_lng = 0.0
+            self.max_lat = self.max_lng = 0.0
+        else:
+            self.min_lat, self.max_lat = float(lats.min()), float(lats.max())
+            self.min_lng, self.max_lng = float(lngs.min()), float(lngs.max())
+        if cell_deg is None:
+            area = max((self.max_lat - self.min_lat) * (self.max_lng - self.min_lng), 1e-6)
+            cell_deg = math.sqrt(area * TARGET_PER_CELL / max(self.size, 1))
+        self.cell_deg = max(float(cell_deg), 1e-4)
+        self.n_rows = int((self.max_lat - self.min_lat) / self.cell_deg) + 1
+        self.n_cols = int((self.max_lng - self.min_lng) / self.cell_deg) + 1
+
+        cells = self._row(lats) * self.n_cols + self._col(lngs)
+        self.order = np.argsort(cells, kind="stable")   # sorted position -> original row
+        sorted_cells = cells[self.order]
+        self.lats = lats[self.order]
+        self.lngs = lngs[self.order]
+        # starts[c] .. starts[c + 1] is the slice of points in cell c
+        self.starts = np.searchsorted(sorted_cells, np.arange(self.n_rows * self.n_cols + 1))
+
+    def _row(self, lat):
+        return np.clip(((np.asarray(lat) - self.min_lat) / self.cell_deg).astype(np.int64), 0, self.n_rows - 1)
+
+    def _col(self, lng):
+        return np.clip(((np.asarray(lng) - self.min_lng) / self.cell_deg).astype(np.int64), 0, self.n_cols - 1)
+
+    def _candidates(self, min_lat, min_lng, max_lat, max_lng):
+        """Sorted positions of points in the grid cells overlapping the box."""
+        if self.size == 0 or max_lat < self.min_lat or min_lat > self.max_lat \
+                or max_lng < self.min_lng or min_lng > self.max_lng:
+            return np.empty(0, dtype=np.int64)
+        r0, r1 = int(self._row(min_lat)), int(self._row(max_lat))
+        c0, c1 = int(self._col(min_lng)), int(self._col(max_lng))
+        rows = np.arange(r0, r1 + 1) * self.n_cols
+        lo, hi = self.starts[rows + c0], self.starts[rows + c1 + 1]
+        if len(lo) == 1:
+            return np.arange(lo[0], hi[0])
+        return np.concatenate([np.arange(a, b) for a, b in zip(lo, hi)])
+
+    @staticmethod
+    def _box(lat, lng, radius_km):
+        dlat = radius_km / KM_PER_DEG_LAT
+        cos_lat = max(math.cos(math.radians(min(abs(lat) + dlat, 89.9))), 1e-6)
+        dlng = radius_km / (KM_PER_DEG_LAT * cos_lat)
+        return lat - dlat, lng - dlng, lat + dlat, lng + dlng
+
+    # ---------- single-point queries ----------
+    def radius(self, lat, lng, radius_km):
+        """(row indices, distances in km) of points within `radius_km`, nearest first."""
+        pos = self._candidates(*self._box(lat, lng, radius_km))
+        dist = haversine_km(lat, lng, self.lats[pos], self.lngs[pos])
+        keep = dist <= radius_km
+        pos, dist = pos[keep], dist[keep]
+        order = np.argsort(dist, kind="stable")
+        return self.order[pos[order]], dist[order]
+
+    def knn(self, lat, lng, k):
+        """(row indices, distances in km) of the `k` nearest points, nearest first."""
+        k = min(int(k), self.size)
+        if k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        # Start with a box expected to hold ~k points and double it until the k-th
+        # nearest candidate is inside the searched radius (so nothing closer was missed).
+        radius_km = self.cell_deg * KM_PER_DEG_LAT * math.sqrt(max(k / TARGET_PER_CELL, 1.0))
+        span_km = KM_PER_DEG_LAT * (max(self.max_lat - self.min_lat, self.max_lng - self.min_lng) + self.cell_deg)
+        while True:
+            pos = self._candidates(*self._box(lat, lng, radius_km))
+            if len(pos) >= k or radius_km > 2 * span_km + 20000:
+                dist = haversine_km(lat, lng, self.lats[pos], self.lngs[pos])
+                if len(pos) >= k:
+                    top = np.argpartition(dist, k - 1)[:k]
+                    if dist[top].max() <= radius_km:
+                        order = top[np.argsort(dist[top], kind="stable")]
+                        return self.order[pos[order]], dist[order]
+                else:
+                    order = np.argsort(dist, kind="stable")
+                    return self.order[pos[order]], dist[order]
+            radius_km *= 2
+
+    def bbox(self, min_lat, min_lng, max_lat, max_lng):
+        """Row indices of points inside the box (inclusive)."""
+        pos = self._candidates(min_lat, min_lng, max_lat, max_lng)
+        lat, lng = self.lats[pos], self.lngs[pos]
+        keep = (lat >= min_lat) & (lat <= max_lat) & (lng >= min_lng) & (lng <= max_lng)
+        return np.sort(self.order[pos[keep]])
+
+    # ---------- batch queries ----------
+    def knn_batch(self, lats, lngs, k):
+        """(indices, distances) arrays of shape (m, k); short rows are padded with -1 / inf."""
+        lats, lngs = np.asarray(lats, dtype=np.float64), np.asarray(lngs, dtype=np.float64)
+        idx = np.full((len(lats), k), -1, dtype=np.int64)
+        dist = np.full((len(lats), k), np.inf)
+        if self.size and len(lats) * self.size <= 200_000:
+            # Small enough for one brute-force distance matrix
+            d = haversine_km(lats[:, None], lngs[:, None], self.lats[None, :], self.lngs[None, :])
+            kk = min(k, self.size)
+            top = np.argpartition(d, kk - 1, axis=1)[:, :kk]
+            top_d = np.take_along_axis(d, top, axis=1)
+            order = np.argsort(top_d, axis=1, kind="stable")
+            idx[:, :kk] = self.order[np.take_along_axis(top, order, axis=1)]
+            dist[:, :kk] = np.take_along_axis(top_d, order, axis=1)
+            return idx, dist
+        for i, (lat, lng) in enumerate(zip(lats, lngs)):
+            found, d = self.knn(lat, lng, k)
+            idx[i, :len(found)] = found
+            dist[i, :len(found)] = d
+        return idx, dist
+
+    def radius_batch(self, lats, lngs, radius_km):
+        """List of (indices, distances) per query point."""
+        return [self.radius(lat, lng, radius_km) for lat, lng in zip(lats, lngs)]
+
+
+class _CellGrid:
+    """Points binned into square cells `cell_km` wide (slightly oversized, so the 3x3
+    block of cells around a point holds everything within `cell_km` of it)."""
+
+    def __init__(self, lats, lngs, cell_km, cos_lat):
+        cell_lat = cell_km / (KM_PER_DEG_LAT * 0.99)
+        cell_lng = cell_lat / cos_lat
+        rows = ((lats - lats.min()) / cell_lat).astype(np.int64) + 1   # +1 leaves a border row/col
+        cols = ((lngs - lngs.min()) / cell_lng).astype(np.int64) + 1
+        n_cols = int(cols.max()) + 2
+        self.cell_km = cell_km
+        self.cells = rows * n_cols + cols
+        self.order = np.argsort(self.cells, kind="stable")   # sorted position -> point
+        self.sorted_cells = self.cells[self.order]
+        self.rank = np.empty_like(self.order)                # point -> sorted position
+        self.rank[self.order] = np.arange(len(self.order))
+        self.lats, self.lngs = lats[self.order], lngs[self.order]
+        self.offsets = [dr * n_cols + dc for dr in (-1, 0, 1) for dc in (-1, 0, 1)]
+
+    def block(self, pos):
+        """(first sorted position, count) of the points in each of the 9 cells around
+        the points at sorted positions `pos`, as two (9, len(pos)) arrays."""
+        src_cells = self.sorted_cells[pos]
+        lo = np.stack([np.searchsorted(self.sorted_cells, src_cells + o, side="left") for o in self.offsets])
+        hi = np.stack([np.searchsorted(self.sorted_cells, src_cells + o, side="right") for o in self.offsets])
+        return lo, hi - lo
+
+
+def _knn_pass(grid, src, k, cos_lat, final):
+    """One pass of nearest_neighbors over the points `src` on `grid`.
+
+    Returns ([(i, j, d)] for the points whose k nearest are settled, unsettled points).
+    Works on sorted positions throughout, so neighbouring points are close in memory.
+    """
+    cell_km = grid.cell_km
+    src = np.sort(grid.rank[src])
+    found, unsettled = [], []
+    for b0 in range(0, len(src), KNN_SOURCE_BLOCK):
+        block = src[b0:b0 + KNN_SOURCE_BLOCK]
+        lo, counts = grid.block(block)
+        totals = np.cumsum(counts.sum(axis=0))
+        start = 0
+        while start < len(block):
+            # sources whose candidate pairs fit in one KNN_PAIR_BLOCK (at least one source)
+            base = int(totals[start - 1]) if start else 0
+            end = max(int(np.searchsorted(totals, base + KNN_PAIR_BLOCK, side="right")), start + 1)
+            i_parts, j_parts = [], []
+            for o in range(len(grid.offsets)):
+                c = counts[o, start:end]
+                total = int(c.sum())
+                if total:
+                    within = np.arange(total) - np.repeat(np.cumsum(c) - c, c)
+                    i_parts.append(np.repeat(block[start:end], c))
+                    j_parts.append(np.repeat(lo[o, start:end], c) + within)
+            i = np.concatenate(i_parts) if i_parts else np.empty(0, dtype=np.int64)
+            j = np.concatenate(j_parts) if j_parts else np.empty(0, dtype=np.int64)
+            # Cheap planar pre-filter (slightly generous) before the exact haversine
+            dy = (grid.lats[j] - grid.lats[i]) * KM_PER_DEG_LAT
+            dx = (grid.lngs[j] - grid.lngs[i]) * (KM_PER_DEG_LAT * cos_lat)
+            keep = (i != j) & (dx * dx + dy * dy <= (cell_km * 1.01) ** 2)
+            i, j = i[keep], j[keep]
+            d = haversine_km(grid.lats[i], grid.lngs[i], grid.lats[j], grid.lngs[j])
+            keep = d <= cell_km
+            i, j, d = i[keep], j[keep], d[keep]
+
+            # k nearest per source; a source is settled once k of them lie within the cell
+            # width (nothing closer can be outside its 3x3 block), or on the final pass
+            by_source = np.lexsort((d, i))
+            i, j, d = i[by_source], j[by_source], d[by_source]
+            sources, first, hits = np.unique(i, return_index=True, return_counts=True)
+            settled = sources if final else sources[hits >= k]
+            rank = np.arange(len(i)) - np.repeat(first, hits)
+            keep = (rank < k) & np.isin(i, settled)
+            found.append((grid.order[i[keep]], grid.order[j[keep]], d[keep]))
+            unsettled.append(grid.order[np.setdiff1d(block[start:end], settled, assume_unique=True)])
+            start = end
+    return found, np.concatenate(unsettled) if unsettled else src[:0]
+
+
+def nearest_neighbors(lats, lngs, k, radius_km):
+    """(i, j, distance_km) linking each point to its up to `k` nearest others within `radius_km`.
+
+    Work and memory stay proportional to n * k however clustered the points are. Each
+    point starts on a grid whose cells are as fine as its local density allows (down
+    to radius / sqrt(2)**KNN_LEVELS) and is matched against the 3x3 cells around it;
+    points that don't find k neighbours that close move on to cells sqrt(2) times
+    wider, up to `radius_km`. Candidate pairs are generated KNN_PAIR_BLOCK at a time.
+    """
+    lats = np.asarray(lats, dtype=np.float64)
+    lngs = np.asarray(lngs, dtype=np.float64)
+    found = []
+    if len(lats) and k > 0:
+        cos_lat = max(math.cos(math.radians(min(float(np.abs(lats).max()) + radius_km / KM_PER_DEG_LAT, 89.9))),
+                      1e-6)
+        coarse = _CellGrid(lats, lngs, radius_km, cos_lat)
+        # A block sqrt(2)**L times narrower holds ~2**L times fewer points; aim for ~2(k+1)
+        # in it (the disk a pass can settle is about a third of the block)
+        dense = np.zeros(len(lats))
+        for b0 in range(0, len(lats), KNN_SOURCE_BLOCK):
+            pos = np.arange(b0, min(b0 + KNN_SOURCE_BLOCK, len(lats)))
+            dense[coarse.order[pos]] = coarse.block(pos)[1].sum(axis=0)
+        start_level = np.clip(np.floor(np.log2(dense / (2 * (k + 1)))), 0, KNN_LEVELS).astype(np.int64)
+
+        pending = np.empty(0, dtype=np.int64)
+        for level in range(KNN_LEVELS, -1, -1):
+            pending = np.concatenate([pending, np.flatnonzero(start_level == level)])
+            if not len(pending):
+                continue
+            grid = coarse if level == 0 else _CellGrid(lats, lngs, radius_km / math.sqrt(2) ** level, cos_lat)
+            settled, pending = _knn_pass(grid, pending, k, cos_lat, level == 0)
+            found.extend(settled)
+    if not found:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty, np.empty(0)
+    return tuple(np.concatenate(parts) for parts in zip(*found))
+
+
+# ---------------- DATASET INDEXES ----------------
+# Column names of the coordinate columns per dataset
+COORDS = {"landmarks": ("Lat", "Lng"), "hotspots": ("lat", "lng")}
+
+_indexes = {}
+_lock = threading.Lock()
+
+
+def index_for(name, path=None):
+    """Process-wide GeoIndex over a dataset; rebuilt when the dataset is recompiled."""
+    ds = datasets.load(name, path)
+    cached = _indexes.get((name, path))
+    if cached is not None and cached[0] == ds.fingerprint:
+        return cached[1], ds
+    with _lock:
+        lat_col, lng_col = COORDS[name]
+        index = GeoIndex(ds[lat_col], ds[lng_col])
+        _indexes[(name, path)] = (ds.fingerprint, index)
+    return index, ds
+
+
+def nearby(name, lat, lng, k=None, radius_km=None, path=None):
+    """DataFrame of dataset rows near (lat, lng) with a distance_km column, nearest first.
+
+    Pass `k` for the k nearest, `radius_km` for everything within a radius, or both
+    for the k nearest within the radius.
+    """
+    index, ds = index_for(name, path)
+    if radius_km is not None:
+        idx, dist = index.radius(lat, lng, radius_km)
+        if k is not None:
+            idx, dist = idx[:k], dist[:k]
+    else:
+        idx, dist = index.knn(lat, lng, k or 5)
+    rows = ds.to_frame().iloc[idx].copy()
+    rows["distance_km"] = np.round(dist, 2)
+    return rows
@@ -0,0 +1,274 @@
+import os
+import re
+import math
+import sqlite3
+import threading
+from collections import defaultdict
+
+import datasets
+from batch_translate import normalize
+
+# ---------- CONFIG ----------
+ENABLED = os.environ.get("TRAVELSMART_RETRIEVAL", "1") == "1"   # 0 sends every doubt to the LLM
+KB_PATH = os.environ.get("TRAVELSMART_KB_PATH", "knowledge.db")
+BM25_K1 = 1.5
+BM25_B = 0.75
+MIN_SCORE = 0.8           # BM25 score an instant answer needs
+MIN_COVERAGE = 0.6        # share of the question's content words the passage must contain
+CONTEXT_PASSAGES = 3      # passages passed to the LLM as notes
+CONTEXT_CHARS = 600       # ... and their total length
+# ----------------------------
+
+# ---------------- TEXT ----------------
+STOPWORDS = set("""
+a an the and or but of in on at to for from with by about as into than then is are was were be been being
+it its this that these those there here i you he she we they me my your our their his her them us
+do does did done can could will would shall should may might must have has had having not no
+what when where who whom whose which why how tell know explain please also any some much many
+s very just more most""".split())
+
+# Words a tourist might use for the same fact as the description does
+ALIASES = {
+    "build": "built", "constructed": "built", "construct": "built", "construction": "built",
+    "erected": "built", "founded": "built", "established": "built",
+    "tall": "height", "high": "height",
+    "located": "in", "situated": "in",
+}
+
+# Question words -> pattern the answering passage must contain
+ANSWER_TYPES = [
+    (re.compile(r"\b(when|year|century|date|old)\b"), re.compile(r"\b(1\d{3}|20\d{2}|\d{1,2}(st|nd|rd|th) century)\b")),
+    (re.compile(r"\bwho\b"), re.compile(r"\bby [A-Z]|\b(emperor|king|queen|ruler|dynasty)\b")),
+    (re.compile(r"\bhow (tall|high|long|big|large|wide|deep)\b"),
+     re.compile(r"\b\d+(\.\d+)?\s*(m|metres?|meters?|ft|feet|km|kilometres?|kilometers?|miles?|acres?|hectares?)\b")),
+    (re.compile(r"\bwhere\b"), re.compile(r"\b(in|near) [A-Z]")),
+]
+
+_SENTENCE = re.compile(r"(?<=[.!?])\s+")
+
+
+def tokenize(text):
+    tokens = []
+    for word in re.findall(r"[a-z0-9]+", normalize(text)):
+        word = ALIASES.get(word, word)
+        if word in STOPWORDS:
+            continue
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        tokens.append(word)
+    return tokens
+
+
+def sentences(text):
+    return [s.strip() for s in _SENTENCE.split(text.strip()) if s.strip()]
+
+
+def title_matches(title_tokens, place_tokens):
+    """A passage about `title` is about `place` if either name contains the other."""
+    return bool(title_tokens) and bool(place_tokens) and (
+        title_tokens <= place_tokens or place_tokens <= title_tokens)
+
+
+# ---------------- INDEX ----------------
+class KnowledgeIndex:
+    """In-memory BM25 inverted index over short passages, each tagged with a title and source."""
+
+    def __init__(self):
+        self.passages = []                    # (title, text, source)
+        self.tokens = []                      # set of tokens per passage
+        self.lengths = []
+        self.total_length = 0
+        self.postings = defaultdict(dict)     # term -> {passage id: term frequency}
+        self.titles = defaultdict(list)       # frozenset(title tokens) -> passage ids
+        self.seen = set()
+
+    def __len__(self):
+        return len(self.passages)
+
+    def add(self, title, text, source):
+        if (title, text) in self.seen:
+            return
+        self.seen.add((title, text))
+        doc = len(self.passages)
+        tokens = tokenize(text)
+        self.passages.append((title, text, source))
+        self.tokens.append(set(tokens))
+        self.lengths.append(len(tokens))
+        self.total_length += len(tokens)
+        for term in tokens:
+            self.postings[term][doc] = self.postings[term].get(doc, 0) + 1
+        self.titles[frozenset(tokenize(title))].append(doc)
+
+    def docs_about(self, place):
+        place_tokens = set(tokenize(place))
+        return {doc for title, docs in self.titles.items() if title_matches(title, place_tokens) for doc in docs}
+
+    def search(self, query_tokens, docs=None, k=5):
+        """[(score, passage id)] best first; restricted to `docs` when given."""
+        n = len(self.passages)
+        if not n:
+            return []
+        avg_length = self.total_length / n
+        scores = defaultdict(float)
+        for term in set(query_tokens):
+            posting = self.postings.get(term)
+            if not posting:
+                continue
+            idf = math.log(1 + (n - len(posting) + 0.5) / (len(posting) + 0.5))
+            for doc, tf in posting.items():
+                if docs is not None and doc not in docs:
+                    continue
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self.lengths[doc] / avg_length)
+                scores[doc] += idf * tf * (BM25_K1 + 1) / (tf + norm)
+        return sorted(((s, d) for d, s in scores.items()), reverse=True)[:k]
+
+
+# ---------------- KNOWLEDGE BASE ----------------
+class KnowledgeBase:
+    """Landmark descriptions plus stored Wikipedia summaries and earlier LLM answers.
+
+    Summaries and answers are kept in SQLite so they survive restarts; the index is
+    rebuilt from them (and landmarks.json) whenever the landmark file changes.
+    """
+
+    def __init__(self, path=KB_PATH):
+        self.lock = threading.RLock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        with self.conn:
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS passages ("
+                " title TEXT NOT NULL, text TEXT NOT NULL, source TEXT NOT NULL, PRIMARY KEY (title, text))"
+            )
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS answers ("
+                " place TEXT NOT NULL, question TEXT NOT NULL, lang TEXT NOT NULL, answer TEXT NOT NULL,"
+                " PRIMARY KEY (place, question, lang))"
+            )
+        self.index = None
+        self.version = None
+        self.stats = {"instant": 0, "previous": 0, "llm": 0}
+
+    def _current_index(self):
+        ds = datasets.load("landmark_descriptions")
+        if self.index is not None and self.version == ds.fingerprint:
+            return self.index
+        with self.lock:
+            if self.index is None or self.version != ds.fingerprint:
+                index = KnowledgeIndex()
+                for name, desc in zip(ds["name"], ds["description"]):
+                    for sentence in sentences(str(desc)):
+                        index.add(str(name), sentence, "landmarks")
+                for title, text, source in self.conn.execute("SELECT title, text, source FROM passages"):
+                    index.add(title, text, source)
+                self.index, self.version = index, ds.fingerprint
+            return self.index
+
+    def remember(self, title, text, source):
+        """Store a passage (e.g. a Wikipedia summary) and index it sentence by sentence."""
+        if not text or not text.strip():
+            return
+        parts = sentences(text)
+        index = self._current_index()
+        with self.lock, self.conn:
+            self.conn.executemany("INSERT OR IGNORE INTO passages (title, text, source) VALUES (?, ?, ?)",
+                                  [(title, part, source) for part in parts])
+            for part in parts:
+                index.add(title, part, source)
+
+    def remember_answer(self, place, question, lang, answer):
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO answers (place, question, lang, answer) VALUES (?, ?, ?, ?)",
+                (normalize(place), normalize(question), lang, answer),
+            )
+        if lang == "English":
+            self.remember(place, answer, "answer")
+
+    def previous_answer(self, place, question, lang):
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT answer FROM answers WHERE place=? AND question=? AND lang=?",
+                (normalize(place), normalize(question), lang),
+            ).fetchone()
+        return row[0] if row else None
+
+    def retrieve(self, place, question, k=CONTEXT_PASSAGES):
+        """[(score, title, text, source)] for the question, preferring passages about `place`."""
+        index = self._current_index()
+        with self.lock:
+            query = tokenize(f"{place} {question}")
+            hits = index.search(query, index.docs_about(place) or None, k)
+            return [(score, *index.passages[doc]) for score, doc in hits]
+
+    def instant_answer(self, place, question):
+        """A passage that answers `question` outright, or None when the LLM is needed."""
+        index = self._current_index()
+        place_tokens = set(tokenize(place))
+        content = set(tokenize(question)) - place_tokens
+        wanted = [answer for asks, answer in ANSWER_TYPES if asks.search(normalize(question))]
+        if not content and not wanted:
+            return None
+        with self.lock:
+            docs = sorted(d for d in index.docs_about(place) if index.passages[d][2] != "answer")
+            if not content:
+                # e.g. "where is it?": the first passage of the right type
+                candidates = docs
+            else:
+                candidates = [doc for score, doc in index.search(content, set(docs), k=3)
+                              if score >= MIN_SCORE
+                              and len(content & index.tokens[doc]) / len(content) >= MIN_COVERAGE]
+            for doc in candidates:
+                text = index.passages[doc][1]
+                if all(p.search(text) for p in wanted):
+                    return text
+        return None
+
+    def context(self, place, question):
+        """Top passages as compact bullet notes for the LLM prompt ('' if nothing relevant)."""
+        notes, used = [], 0
+        for _, title, text, _ in self.retrieve(place, question):
+            line = f"- {title}: {text}"
+            if used + len(line) > CONTEXT_CHARS:
+                break
+            notes.append(line)
+            used += len(line)
+        return "\n".join(notes)
+
+    def _count(self, outcome):
+        with self.lock:
+            self.stats[outcome] += 1
+
+    def answer(self, place, question, lang, ask_llm, translate=None):
+        """Answer from stored answers or passages when possible, else ask_llm(notes).
+
+        `translate(text)` renders an English passage into `lang` for instant answers.
+        Exceptions from ask_llm propagate and nothing is stored.
+        """
+        if ENABLED:
+            previous = self.previous_answer(place, question, lang)
+            if previous is not None:
+                self._count("previous")
+                return previous
+            text = self.instant_answer(place, question)
+            if text is not None:
+                self._count("instant")
+                return text if lang == "English" or translate is None else translate(text)
+        self._count("llm")
+        answer = ask_llm(self.context(place, question) if ENABLED else "")
+        if ENABLED and answer:
+            self.remember_answer(place, question, lang, answer)
+        return answer
+
+
+_kb = None
+_kb_lock = threading.Lock()
+
+
+def get_knowledge():
+    """Process-wide knowledge base at KB_PATH."""
+    global _kb
+    if _kb is None:
+        with _kb_lock:
+            if _kb is None:
+                _kb = KnowledgeBase()
+    return _kb
@@ -0,0 +1,120 @@
+import threading
+import unicodedata
+from functools import lru_cache
+
+import datasets
+
+# ---------------- SCRIPT-BASED LANGUAGE ID ----------------
+# Most non-Latin inputs can be identified from their Unicode block alone, which is
+# instant and deterministic. Only Latin-script text that could be a foreign language
+# is handed to langdetect (loaded lazily, seeded so results are repeatable), and only
+# a confident guess is returned.
+
+# (first codepoint, last codepoint, language code) — codes match chatbot2.languages
+SCRIPT_RANGES = [
+    (0x0400, 0x04FF, "ru"),     # Cyrillic
+    (0x0600, 0x06FF, "ar"),     # Arabic
+    (0x0900, 0x097F, "hi"),     # Devanagari (Marathi shares it; Hindi is the default)
+    (0x0980, 0x09FF, "bn"),     # Bengali
+    (0x0A00, 0x0A7F, "pa"),     # Gurmukhi
+    (0x0A80, 0x0AFF, "gu"),     # Gujarati
+    (0x0B00, 0x0B7F, "or"),     # Odia
+    (0x0B80, 0x0BFF, "ta"),     # Tamil
+    (0x0C00, 0x0C7F, "te"),     # Telugu
+    (0x0C80, 0x0CFF, "kn"),     # Kannada
+    (0x0D00, 0x0D7F, "ml"),     # Malayalam
+    (0x3040, 0x30FF, "ja"),     # Hiragana + Katakana
+    (0x4E00, 0x9FFF, "zh-cn"),  # CJK Unified Ideographs
+    (0xAC00, 0xD7AF, "ko"),     # Hangul syllables
+]
+
+UNKNOWN = "unknown"
+
+# A statistical guess on one to three words ("Merci beaucoup", "Red Fort") is noise, so
+# short plain-ASCII input is left as UNKNOWN for the translator (source "auto") to settle,
+# unless it is the name of a landmark we know (those names are English).
+SHORT_ASCII_WORDS = 3
+MIN_CONFIDENCE = 0.9   # langdetect probability needed to trust its top language
+PLACE_SOURCES = [("landmarks", "Name"), ("landmark_descriptions", "name")]
+
+
+def _script_language(ch):
+    cp = ord(ch)
+    for lo, hi, code in SCRIPT_RANGES:
+        if lo <= cp <= hi:
+            return code
+    return None
+
+
+def script_counts(text):
+    """Count letters per script-derived language code; Latin letters count as 'latin'."""
+    counts = {}
+    for ch in text:
+        if not ch.isalpha():
+            continue
+        code = _script_language(ch)
+        if code is None:
+            code = "latin" if "LATIN" in unicodedata.name(ch, "") else "other"
+        counts[code] = counts.get(code, 0) + 1
+    return counts
+
+
+def _statistical_detect(text):
+    try:
+        from langdetect import DetectorFactory, detect_langs
+        DetectorFactory.seed = 0
+        best = detect_langs(text)[0]
+    except Exception:
+        return UNKNOWN
+    return best.lang if best.prob >= MIN_CONFIDENCE else UNKNOWN
+
+
+def _name_key(text):
+    return " ".join(text.casefold().strip(" \t\n?!.,").split())
+
+
+_places = {}  # dataset name -> (fingerprint, name keys)
+_places_lock = threading.Lock()
+
+
+def is_known_place(text):
+    """True if `text` is (case- and spacing-insensitively) a landmark name from our data."""
+    key = _name_key(text)
+    for name, column in PLACE_SOURCES:
+        try:
+            ds = datasets.load(name)
+        except (OSError, ValueError):
+            continue  # missing or invalid file: no names from it
+        cached = _places.get(name)
+        if cached is None or cached[0] != ds.fingerprint:
+            with _places_lock:
+                cached = _places[name] = (ds.fingerprint, frozenset(_name_key(str(v)) for v in ds[column]))
+        if key in cached[1]:
+            return True
+    return False
+
+
+def detect_language(text):
+    """Best-guess language code for `text` (e.g. 'en', 'hi', 'ta'); UNKNOWN when unsure."""
+    if text.isascii() and len(text.split()) <= SHORT_ASCII_WORDS and is_known_place(text):
+        return "en"
+    return _detect_language(text)
+
+
+@lru_cache(maxsize=4096)
+def _detect_language(text):
+    counts = script_counts(text)
+    if not counts:
+        return UNKNOWN
+    code = max(counts, key=counts.get)
+    if code == "zh-cn" and counts.get("ja"):
+        return "ja"  # Japanese mixes kanji with kana
+    if code not in ("latin", "other"):
+        return code
+    if text.isascii() and len(text.split()) <= SHORT_ASCII_WORDS:
+        return UNKNOWN
+    return _statistical_detect(text)
+
+
+def is_english(text):
+    return detect_language(text.strip()) == "en"
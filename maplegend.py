@@ -1,37 +1,64 @@
 import streamlit as st
 import streamlit.components.v1 as components
+import os
+import json
 import pandas as pd
-import random
 import threading
 import time
-import requests
+
+import api_clients
+import datasets
+import geo_index
+import metrics
+import risk_engine
+
+NEARBY_HOTSPOT_KM = 2.0
 
 # ---------------- AI Agent Layer ----------------
+RISK_TICK_SEC = 30
+RISK_SEED = os.environ.get("TRAVELSMART_RISK_SEED")  # set for reproducible simulations
+
+
 def simulate_ai_updates(hotspots_file="hotspots.csv"):
+    engine, df, written_mtime = None, None, None
     while True:
         try:
-            df = pd.read_csv(hotspots_file)
-            if "risk_level" not in df.columns:
-                df["risk_level"] = [random.randint(1, 5) for _ in range(len(df))]
-            else:
-                for i in range(len(df)):
-                    change = random.choice([-1, 0, 1])
-                    new_level = max(1, min(5, df.at[i, "risk_level"] + change))
-                    df.at[i, "risk_level"] = new_level
-            df.to_csv(hotspots_file, index=False)
+            # (Re)build the engine on start and whenever someone else edits the file
+            if engine is None or os.stat(hotspots_file).st_mtime_ns != written_mtime:
+                ds = datasets.load("hotspots", hotspots_file)
+                df = pd.read_csv(hotspots_file)
+                # Decay toward the curated base_risk (kept in its own column and never
+                # simulated), continuing from the current levels
+                df["risk_level"], df["base_risk"] = ds["risk_level"], ds["base_risk"]
+                engine = risk_engine.RiskEngine(ds["lat"], ds["lng"], ds["base_risk"], ds["crime_type"],
+                                                seed=None if RISK_SEED is None else int(RISK_SEED),
+                                                levels=ds["risk_level"])
+            with metrics.span("hotspots.tick"):
+                df["risk_level"] = engine.step()
+            with metrics.span("hotspots.rewrite"):
+                # write-then-rename so page reruns never read a half-written file
+                tmp = f"{hotspots_file}.tmp-{os.getpid()}-{threading.get_ident()}"
+                df.to_csv(tmp, index=False)
+                os.replace(tmp, hotspots_file)
+            written_mtime = os.stat(hotspots_file).st_mtime_ns
         except Exception as e:
             print("AI Agent error:", e)
-        time.sleep(30)  # update every 30s
+        time.sleep(RISK_TICK_SEC)
+
+# Start AI simulation in background ONLY ONCE per process (not per session: each
+# thread would see the others' writes and rebuild the engine on every tick)
+@st.cache_resource
+def start_ai_updates(hotspots_file="hotspots.csv"):
+    thread = threading.Thread(target=simulate_ai_updates, args=(hotspots_file,), daemon=True)
+    thread.start()
+    return thread
 
-# Start AI simulation in background ONLY ONCE
-if "ai_thread_started" not in st.session_state:
-    threading.Thread(target=simulate_ai_updates, daemon=True).start()
-    st.session_state["ai_thread_started"] = True
+start_ai_updates()
 
 # ---------------- IP-based Location Fallback ----------------
 def get_location_from_ip():
     try:
-        res = requests.get("https://ipinfo.io/json", timeout=5).json()
+        res = api_clients.ip_info()
         loc = res["loc"].split(",")
         lat, lon = float(loc[0]), float(loc[1])
         return lat, lon
@@ -39,58 +66,85 @@ def get_location_from_ip():
         print("Error fetching IP location:", e)
         return None, None
 
-# ---------------- FUNCTION ----------------
-def crime_aware_route_planner():
-    #st.title("🛡 Crime-Aware Route Planner with AI Agent Layer")
-    st.markdown("<h1 style='text-align:center; color:#2c3e50;'>🛡 Crime-Aware Route Planner</h1>", unsafe_allow_html=True)
+# ---------------- MAP PAGE HTML ----------------
+# The page is built once per data version (landmarks + hotspots fingerprints) with a
+# placeholder for the initial map centre; each rerun only splices the centre in.
+# Markers are shipped as compact JSON column arrays and created by one JS loop.
 
+# Tourist category icons
+CATEGORY_ICONS = {
+    "Monuments & Heritage Sites": "🏛",
+    "Forts & Palaces": "🏰",
+    "Temples & Religious Sites": "🛕",
+    "Caves & Ancient Sites": "⛰",
+    "Natural Wonders & Scenic Spots": "🌄",
+    "Wildlife & National Parks": "🐅",
+    "Modern Attractions": "🎡"
+}
+DEFAULT_ICON = "📍"
+CENTER_TOKEN = "__MAP_CENTER__"
+DEFAULT_CENTER = (13.0827, 80.2707)  # Chennai
 
-    # Load datasets
-    tourist_df = pd.read_csv("landmarks.csv")
-    hotspot_df = pd.read_csv("hotspots.csv")
 
-    # Tourist category icons
-    category_icons = {
-        "Monuments & Heritage Sites": "🏛",
-        "Forts & Palaces": "🏰",
-        "Temples & Religious Sites": "🛕",
-        "Caves & Ancient Sites": "⛰",
-        "Natural Wonders & Scenic Spots": "🌄",
-        "Wildlife & National Parks": "🐅",
-        "Modern Attractions": "🎡"
+def _script_json(obj):
+    """JSON that is safe to inline in a <script> block."""
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).replace("</", "<\\/")
+
+
+def map_data(tourist_df, hotspot_df):
+    """(tourists, hotspots) as column arrays; categories are stored once and referenced by index."""
+    codes, categories = pd.factorize(tourist_df["Category"].astype(str))
+    tourists = {
+        "lat": tourist_df["Lat"].astype(float).round(5).tolist(),
+        "lng": tourist_df["Lng"].astype(float).round(5).tolist(),
+        "name": tourist_df["Name"].astype(str).tolist(),
+        "cat": codes.tolist(),
+        "cats": list(categories),
+        "icons": [CATEGORY_ICONS.get(c, DEFAULT_ICON) for c in categories],
+    }
+    risk = hotspot_df["risk_level"] if "risk_level" in hotspot_df.columns else pd.Series(3, index=hotspot_df.index)
+    hotspots = {
+        "lat": hotspot_df["lat"].astype(float).round(5).tolist(),
+        "lng": hotspot_df["lng"].astype(float).round(5).tolist(),
+        "risk": risk.fillna(3).astype(int).tolist(),
     }
+    return tourists, hotspots
+
+
+def build_map_html(tourist_df, hotspot_df, ip_lat, ip_lon):
+    """Full Leaflet page for the given tourist spots, hotspots and initial map centre."""
+    return render_map_page(build_map_template(tourist_df, hotspot_df), ip_lat, ip_lon)
+
+
+def render_map_page(template, ip_lat, ip_lon):
+    head, tail = template
+    return head + _script_json([round(float(ip_lat), 5), round(float(ip_lon), 5)]) + tail
+
+
+_templates = {}
+_template_lock = threading.Lock()
 
-    # Risk color mapping
-    risk_colors = {1: "green", 2: "yellow", 3: "orange", 4: "red", 5: "black"}
-
-    # Generate JS code for tourist spots
-    tourist_js = ""
-    for _, row in tourist_df.iterrows():
-        icon = category_icons.get(row["Category"], "📍")
-        tourist_js += f"""
-        L.marker([{row['Lat']}, {row['Lng']}], {{
-          icon: L.divIcon({{className: 'tourist-icon', html: '{icon}', iconSize: [25, 25]}})
-        }}).bindPopup("<b>{row['Name']}</b><br>Category: {row['Category']}").addTo(touristLayer);
-        """
-
-    # Generate JS code for hotspots (initial load)
-    hotspot_js = ""
-    for _, row in hotspot_df.iterrows():
-        risk = int(row.get("risk_level", 3))
-        color = risk_colors.get(risk, "red")
-        hotspot_js += f"""
-        var marker_{_} = L.circleMarker([{row['lat']}, {row['lng']}], {{
-          color: "{color}",
-          radius: 8,
-          fillOpacity: 0.7
-        }}).bindPopup("⚠ Crime Hotspot<br>Risk Level: {risk}").addTo(hotspotLayer);
-        hotspotMarkers.push({{marker: marker_{_}, lat: {row['lat']}, lng: {row['lng']}}});
-        """
-
-    # Get IP location fallback
-    ip_lat, ip_lon = get_location_from_ip()
-    ip_lat = ip_lat or 13.0827
-    ip_lon = ip_lon or 80.2707
+
+def map_page(ip_lat, ip_lon):
+    """Map page for the current data files, reusing the cached template while they are unchanged."""
+    with metrics.span("map.load_csv"):
+        tourists, hotspots = datasets.load("landmarks"), datasets.load("hotspots")
+    version = (tourists.fingerprint, hotspots.fingerprint)
+    template = _templates.get(version)
+    if template is None:
+        with _template_lock:
+            template = _templates.get(version)
+            if template is None:
+                with metrics.span("map.build_html"):
+                    template = build_map_template(tourists.to_frame(), hotspots.to_frame())
+                _templates.clear()  # only the current version is ever served
+                _templates[version] = template
+    return render_map_page(template, ip_lat, ip_lon)
+
+
+def build_map_template(tourist_df, hotspot_df):
+    """Static page split around the map-centre placeholder: (head, tail)."""
+    tourists, hotspots = map_data(tourist_df, hotspot_df)
 
     # ------------------------------- HTML + JS -------------------------------
     html_code = f"""
@@ -156,7 +210,12 @@ def crime_aware_route_planner():
     <script src="https://unpkg.com/leaflet-control-geocoder/dist/Control.Geocoder.js"></script>
 
     <script>
-    var map = L.map('map').setView([{ip_lat}, {ip_lon}], 12);
+    var mapCenter = {CENTER_TOKEN};
+    var TOURISTS = {_script_json(tourists)};
+    var HOTSPOTS = {_script_json(hotspots)};
+    var RISK_COLORS = {{1:"green",2:"yellow",3:"orange",4:"red",5:"black"}};
+
+    var map = L.map('map', {{ preferCanvas: true }}).setView(mapCenter, 12);
     L.tileLayer('https://{{s}}.tile.openstreetmap.org/{{z}}/{{x}}/{{y}}.png', {{
       attribution: '&copy; OpenStreetMap contributors'
     }}).addTo(map);
@@ -170,11 +229,30 @@ def crime_aware_route_planner():
     var hotspotLayer = L.layerGroup();
     var hotspotMarkers = [];
 
-    // Tourist spots
-    {tourist_js}
+    function escapeHtml(text) {{
+      return String(text).replace(/[&<>"']/g, c => ({{"&":"&amp;","<":"&lt;",">":"&gt;",'"':"&quot;","'":"&#39;"}})[c]);
+    }}
 
-    // Hotspots (initial load)
-    {hotspot_js}
+    // Tourist spots (one shared icon per category)
+    var categoryIcons = TOURISTS.icons.map(icon =>
+      L.divIcon({{className: 'tourist-icon', html: icon, iconSize: [25, 25]}}));
+    for (var i = 0; i < TOURISTS.lat.length; i++) {{
+      var c = TOURISTS.cat[i];
+      L.marker([TOURISTS.lat[i], TOURISTS.lng[i]], {{ icon: categoryIcons[c] }})
+        .bindPopup("<b>" + escapeHtml(TOURISTS.name[i]) + "</b><br>Category: " + escapeHtml(TOURISTS.cats[c]))
+        .addTo(touristLayer);
+    }}
+
+    // Hotspots (initial load; drawn on the canvas renderer)
+    for (var i = 0; i < HOTSPOTS.lat.length; i++) {{
+      var risk = HOTSPOTS.risk[i];
+      var marker = L.circleMarker([HOTSPOTS.lat[i], HOTSPOTS.lng[i]], {{
+        color: RISK_COLORS[risk] || "red",
+        radius: 8,
+        fillOpacity: 0.7
+      }}).bindPopup("⚠ Crime Hotspot<br>Risk Level: " + risk).addTo(hotspotLayer);
+      hotspotMarkers.push({{marker: marker, lat: HOTSPOTS.lat[i], lng: HOTSPOTS.lng[i]}});
+    }}
 
     // Smooth color transition for hotspot risk updates
     async function refreshHotspots() {{
@@ -273,7 +351,7 @@ def crime_aware_route_planner():
           L.marker([liveLocation.lat, liveLocation.lng]).bindPopup("You are here").addTo(map);
           document.getElementById("startLocation").value = liveLocation.lat + "," + liveLocation.lng;
         }}, () => {{
-          liveLocation = {{ lat: {ip_lat}, lng: {ip_lon} }};
+          liveLocation = {{ lat: mapCenter[0], lng: mapCenter[1] }};
           map.setView([liveLocation.lat, liveLocation.lng], 12);
           L.marker([liveLocation.lat, liveLocation.lng]).bindPopup("Approximate location").addTo(map);
           document.getElementById("startLocation").value = liveLocation.lat + "," + liveLocation.lng;
@@ -296,10 +374,47 @@ def crime_aware_route_planner():
     </body>
     </html>
     """
+    head, _, tail = html_code.partition(CENTER_TOKEN)
+    return head, tail
+
+# ---------------- FUNCTION ----------------
+def crime_aware_route_planner():
+    #st.title("🛡 Crime-Aware Route Planner with AI Agent Layer")
+    st.markdown("<h1 style='text-align:center; color:#2c3e50;'>🛡 Crime-Aware Route Planner</h1>", unsafe_allow_html=True)
+
+
+    # IP location fallback, looked up once per session (later reruns don't wait on it)
+    if "map_center" not in st.session_state:
+        with metrics.span("map.ip_lookup"):
+            ip_lat, ip_lon = get_location_from_ip()
+        if ip_lat is None:
+            ip_lat, ip_lon = DEFAULT_CENTER
+        else:
+            st.session_state["map_center"] = (ip_lat, ip_lon)
+    else:
+        ip_lat, ip_lon = st.session_state["map_center"]
+
+    html_code = map_page(ip_lat, ip_lon)
 
     # Render in Streamlit
     components.html(html_code, height=850, scrolling=True)
 
+    # ---------- What's around me ----------
+    st.subheader("📍 What's Around Me")
+    st.caption(f"Based on your approximate location ({ip_lat:.4f}, {ip_lon:.4f})")
+    col1, col2 = st.columns(2)
+    with col1:
+        st.markdown("**🏛 Nearest tourist spots**")
+        near = geo_index.nearby("landmarks", ip_lat, ip_lon, k=5)
+        st.dataframe(near[["Name", "Category", "distance_km"]], hide_index=True)
+    with col2:
+        st.markdown(f"**⚠ Crime hotspots within {NEARBY_HOTSPOT_KM:g} km**")
+        risky = geo_index.nearby("hotspots", ip_lat, ip_lon, radius_km=NEARBY_HOTSPOT_KM)
+        if risky.empty:
+            st.success("✅ No known hotspots nearby.")
+        else:
+            st.dataframe(risky[["name", "crime_type", "risk_level", "distance_km"]], hide_index=True)
+
 # ---------------- MAIN APP ----------------
 if __name__ == "__main__":
     crime_aware_route_planner()
@@ -0,0 +1,206 @@
+import os
+import json
+import time
+import bisect
+import threading
+from functools import wraps
+from contextlib import contextmanager
+
+# ---------- CONFIG ----------
+# TRAVELSMART_METRICS=1 turns tracing on. When off, span() is a shared no-op and
+# @timed returns the function unchanged, so the hot paths pay (almost) nothing.
+ENABLED = os.environ.get("TRAVELSMART_METRICS", "0") == "1"
+METRICS_PORT = int(os.environ.get("TRAVELSMART_METRICS_PORT", "0"))     # Prometheus text endpoint
+JSON_DUMP_PATH = os.environ.get("TRAVELSMART_METRICS_JSON", "")         # periodic JSON dump
+JSON_DUMP_SEC = float(os.environ.get("TRAVELSMART_METRICS_JSON_SEC", "60"))
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)  # seconds
+SESSION_SPANS = 200   # most recent spans kept per Streamlit session for the sidebar profile
+# ----------------------------
+
+
+# ---------------- HISTOGRAMS ----------------
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)  # last slot is +Inf
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q):
+        """Upper bucket bound containing the q-th observation (Prometheus-style estimate)."""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for bound, n in zip(BUCKETS, self.counts):
+            seen += n
+            if seen >= target:
+                return min(bound, self.max)
+        return self.max
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "sum_sec": round(self.total, 6),
+            "mean_ms": round(self.total / self.count * 1000, 3) if self.count else 0.0,
+            "p50_ms": self.quantile(0.5) * 1000,
+            "p95_ms": self.quantile(0.95) * 1000,
+            "max_ms": round(self.max * 1000, 3),
+        }
+
+
+_histograms = {}
+_lock = threading.Lock()
+_local = threading.local()
+
+
+def observe(name, seconds):
+    with _lock:
+        hist = _histograms.get(name)
+        if hist is None:
+            hist = _histograms[name] = Histogram()
+        hist.observe(seconds)
+    profile = getattr(_local, "profile", None)
+    if profile is not None:
+        profile.append((name, seconds * 1000))
+        if len(profile) > SESSION_SPANS:
+            del profile[: len(profile) - SESSION_SPANS]
+
+
+# ---------------- SPANS ----------------
+class _NoopSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+@contextmanager
+def _span(name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - start)
+
+
+def span(name):
+    """`with metrics.span("gemini.generate"): ...` records the block's duration."""
+    if not ENABLED:
+        return _NOOP
+    return _span(name)
+
+
+def timed(name):
+    """Decorator form of span(); a no-op (returns `fn` itself) when tracing is off."""
+    def decorate(fn):
+        if not ENABLED:
+            return fn
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                observe(name, time.perf_counter() - start)
+        return wrapper
+    return decorate
+
+
+def bind_session(profile):
+    """Record spans from the current (script) thread into `profile`, a list kept in session state."""
+    _local.profile = profile if ENABLED else None
+
+
+def session_summary(profile):
+    """[{span, calls, total_ms, max_ms}] for a session profile, slowest first."""
+    agg = {}
+    for name, ms in profile:
+        calls, total, peak = agg.get(name, (0, 0.0, 0.0))
+        agg[name] = (calls + 1, total + ms, max(peak, ms))
+    rows = [
+        {"span": name, "calls": calls, "total_ms": round(total, 1), "max_ms": round(peak, 1)}
+        for name, (calls, total, peak) in agg.items()
+    ]
+    return sorted(rows, key=lambda r: r["total_ms"], reverse=True)
+
+
+# ---------------- EXPORT ----------------
+def snapshot():
+    with _lock:
+        return {name: hist.summary() for name, hist in sorted(_histograms.items())}
+
+
+def prometheus_text():
+    lines = [
+        "# HELP travelsmart_span_seconds Duration of instrumented operations.",
+        "# TYPE travelsmart_span_seconds histogram",
+    ]
+    with _lock:
+        items = sorted((name, list(h.counts), h.count, h.total) for name, h in _histograms.items())
+    for name, counts, count, total in items:
+        label = name.replace("\\", "\\\\").replace('"', '\\"')
+        cumulative = 0
+        for bound, n in zip(BUCKETS, counts):
+            cumulative += n
+            lines.append(f'travelsmart_span_seconds_bucket{{span="{label}",le="{bound}"}} {cumulative}')
+        lines.append(f'travelsmart_span_seconds_bucket{{span="{label}",le="+Inf"}} {count}')
+        lines.append(f'travelsmart_span_seconds_sum{{span="{label}"}} {total}')
+        lines.append(f'travelsmart_span_seconds_count{{span="{label}"}} {count}')
+    return "\n".join(lines) + "\n"
+
+
+_exporters_started = False
+
+
+def start_exporters():
+    """Start the HTTP endpoint / JSON dumper configured by env vars (once per process)."""
+    global _exporters_started
+    with _lock:
+        if _exporters_started or not ENABLED:
+            return
+        _exporters_started = True
+    if METRICS_PORT:
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.startswith("/metrics.json"):
+                    body, ctype = json.dumps(snapshot()).encode(), "application/json"
+                else:
+                    body, ctype = prometheus_text().encode(), "text/plain; version=0.0.4"
+                self.send_response(200)
+                self.send_header("Content-Type", ctype)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        try:
+            server = ThreadingHTTPServer(("0.0.0.0", METRICS_PORT), Handler)
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+        except OSError as e:
+            print("Metrics endpoint error:", e)
+    if JSON_DUMP_PATH:
+        def dump_loop():
+            while True:
+                time.sleep(JSON_DUMP_SEC)
+                tmp = JSON_DUMP_PATH + ".tmp"
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump({"timestamp": time.time(), "spans": snapshot()}, f, indent=2)
+                os.replace(tmp, JSON_DUMP_PATH)
+        threading.Thread(target=dump_loop, daemon=True).start()
@@ -0,0 +1,114 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from PIL import Image
+
+# ---------------- PERCEPTUAL HASHES ----------------
+# 64-bit fingerprints that survive re-encoding, resizing and small edits, so the
+# same photo arriving again (another JPEG export, a screenshot, a resized copy)
+# maps to a hash within a few bits of the original.
+
+HASH_SIZE = 8            # 8x8 -> 64-bit hashes
+REDUCING_GAP = 2.0       # cheap integer downscale before the LANCZOS pass (PIL resize option)
+PHASH_SCALE = 4          # pHash works on a (HASH_SIZE * PHASH_SCALE)^2 thumbnail
+MAX_DISTANCE = 8         # hamming distance still treated as the same photo
+CACHE_SIZE = 512         # entries kept (least recently used are evicted)
+
+
+def _bits_to_int(bits):
+    return int.from_bytes(np.packbits(bits.astype(np.uint8).ravel()).tobytes(), "big")
+
+
+def dhash(img, size=HASH_SIZE):
+    """Difference hash: sign of the horizontal gradient on a (size+1) x size thumbnail."""
+    thumb = img.convert("L").resize((size + 1, size), Image.LANCZOS, reducing_gap=REDUCING_GAP)
+    gray = np.asarray(thumb, dtype=np.int16)
+    return _bits_to_int(gray[:, 1:] > gray[:, :-1])
+
+
+_dct_matrices = {}
+
+
+def _dct_matrix(n):
+    if n not in _dct_matrices:
+        k = np.arange(n)[:, None]
+        m = np.cos(np.pi * (2 * np.arange(n)[None, :] + 1) * k / (2 * n)) * np.sqrt(2.0 / n)
+        m[0] /= np.sqrt(2.0)
+        _dct_matrices[n] = m
+    return _dct_matrices[n]
+
+
+def phash(img, size=HASH_SIZE, scale=PHASH_SCALE):
+    """DCT hash: low-frequency DCT coefficients of a grayscale thumbnail vs their median."""
+    n = size * scale
+    thumb = img.convert("L").resize((n, n), Image.LANCZOS, reducing_gap=REDUCING_GAP)
+    gray = np.asarray(thumb, dtype=np.float64)
+    d = _dct_matrix(n)
+    low = (d @ gray @ d.T)[:size, :size].ravel()
+    return _bits_to_int(low > np.median(low[1:]))  # skip the DC term when picking the median
+
+
+def hamming(a, b):
+    return (a ^ b).bit_count()
+
+
+# ---------------- CACHE ----------------
+class PerceptualCache:
+    """LRU cache keyed by perceptual hash; a lookup matches any entry within `max_distance` bits.
+
+    Each entry remembers how long its inference took, so a hit adds that to `saved_sec`.
+    """
+
+    def __init__(self, capacity=CACHE_SIZE, max_distance=MAX_DISTANCE, hash_fn=phash):
+        self.capacity = capacity
+        self.max_distance = max_distance
+        self.hash_fn = hash_fn
+        self.entries = OrderedDict()   # hash -> (value, cost_sec)
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.saved_sec = 0.0
+
+    def _find(self, key):
+        if key in self.entries:
+            return key
+        best, best_dist = None, self.max_distance + 1
+        for other in self.entries:
+            dist = hamming(key, other)
+            if dist < best_dist:
+                best, best_dist = other, dist
+        return best
+
+    def get(self, img):
+        """(value or None, hash). Pass the hash back to put() on a miss."""
+        key = self.hash_fn(img)
+        with self.lock:
+            found = self._find(key)
+            if found is None:
+                self.misses += 1
+                return None, key
+            self.entries.move_to_end(found)
+            value, cost = self.entries[found]
+            self.hits += 1
+            self.saved_sec += cost
+            return value, key
+
+    def put(self, key, value, cost_sec=0.0):
+        with self.lock:
+            self.entries[key] = (value, cost_sec)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.capacity:
+                self.entries.popitem(last=False)
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "saved_sec": self.saved_sec,
+            }
+
@@ -1,16 +1,27 @@
 import streamlit as st
 import pandas as pd
-import requests
-from geopy.geocoders import Nominatim
+
+import api_clients
+import datasets
+import geo_index
+import metrics
+
+def find_state_row(df, state):
+    """Recommendation row for `state` (case-insensitive), or None if it isn't listed."""
+    matches = df[df["State/UT"].str.lower() == state.lower()]
+    if matches.empty:
+        return None
+    return matches.iloc[0]
 
 def travel_assistant_app(csv_file="recommend.csv"):
     # ------------------ Load CSV ------------------
-    df = pd.read_csv(csv_file)
+    with metrics.span("recommend.load_csv"):
+        df = datasets.load_frame("recommend", csv_file)
 
     # ------------------ Step 1: Get Approx Location from IP ------------------
     def get_location_from_ip():
         try:
-            res = requests.get("https://ipinfo.io/json", timeout=5).json()
+            res = api_clients.ip_info()
             loc = res["loc"].split(",")
             lat, lon = float(loc[0]), float(loc[1])
             state = res.get("region", None)
@@ -21,10 +32,9 @@ def travel_assistant_app(csv_file="recommend.csv"):
     # ------------------ Step 2: Reverse Geocode ------------------
     def get_state_from_coords(lat, lon, fallback_state=None):
         try:
-            geolocator = Nominatim(user_agent="tourist_app")
-            location = geolocator.reverse((lat, lon), exactly_one=True, language="en", timeout=10)
-            if location and "address" in location.raw:
-                state = location.raw["address"].get("state", fallback_state)
+            raw = api_clients.reverse_geocode(lat, lon)
+            if "address" in raw:
+                state = raw["address"].get("state", fallback_state)
                 return state
         except Exception:
             return fallback_state
@@ -39,7 +49,7 @@ def travel_assistant_app(csv_file="recommend.csv"):
             """,
             unsafe_allow_html=True,
         )
-        if pd.notna(apps) and pd.notna(links):
+        if pd.notna(apps) and pd.notna(links) and str(apps).strip():
             app_list = [app.strip() for app in str(apps).split(",")]
             link_list = [lnk.strip() for lnk in str(links).split("|")]
             for i, (app, lnk) in enumerate(zip(app_list, link_list), start=1):
@@ -56,9 +66,11 @@ def travel_assistant_app(csv_file="recommend.csv"):
     st.sidebar.header("⚙️ Options")
     use_live_location = st.sidebar.checkbox("Use Live Location")
     if use_live_location:
-        lat, lon, fallback_state = get_location_from_ip()
+        with metrics.span("recommend.ip_lookup"):
+            lat, lon, fallback_state = get_location_from_ip()
         if lat and lon:
-            state = get_state_from_coords(lat, lon, fallback_state)
+            with metrics.span("recommend.reverse_geocode"):
+                state = get_state_from_coords(lat, lon, fallback_state)
         else:
             st.sidebar.error("❌ Could not fetch live location.")
             state = None
@@ -68,7 +80,10 @@ def travel_assistant_app(csv_file="recommend.csv"):
     # ------------------ Show Recommendations ------------------
     if state:
         st.markdown(f"<h2>✨ Recommendations for <span style='color:#16a085'>{state}</span></h2>", unsafe_allow_html=True)
-        row = df[df["State/UT"].str.lower() == state.lower()].iloc[0]
+        row = find_state_row(df, state)
+        if row is None:
+            st.warning(f"❌ No recommendations available for {state}.")
+            return
 
         col1, col2 = st.columns(2)
         with col1:
@@ -109,6 +124,16 @@ def travel_assistant_app(csv_file="recommend.csv"):
         features = [row["Special Feature 1"], row["Special Feature 2"], row["Special Feature 3"]]
         for col, feat in zip(cols, features):
             col.markdown(f"<div style='background:#d6eaf8; padding:12px; border-radius:10px; text-align:center; font-weight:600;'>{feat}</div>", unsafe_allow_html=True)
+
+        # Nearby places (only when we know where the user is)
+        if use_live_location and lat and lon:
+            st.markdown("### 📍 Nearby Landmarks")
+            near = geo_index.nearby("landmarks", lat, lon, k=5)
+            for _, spot in near.iterrows():
+                st.markdown(f"🏛 **{spot['Name']}** ({spot['Category']}) – {spot['distance_km']} km away")
+            risky = geo_index.nearby("hotspots", lat, lon, radius_km=2.0)
+            if not risky.empty:
+                st.warning(f"⚠ {len(risky)} crime hotspot(s) within 2 km – check the Safe Route Planner.")
 # ------------------ CALL THE FUNCTION ------------------
 if __name__ == "__main__":
     travel_assistant_app("recommend.csv")
\ No newline at end of file
@@ -0,0 +1,102 @@
+import time
+
+import numpy as np
+
+import geo_index
+
+# ---------------- RISK ENGINE ----------------
+# Every hotspot carries a continuous risk level in [1, 5]. One tick moves all of
+# them at once:
+#   level += DECAY     * (target - level)          pull toward baseline + hour-of-day offset
+#          + DIFFUSION * (neighbour mean - level)  spread from hotspots within NEIGHBOR_KM
+#          + noise                                 seeded normal noise
+# The neighbour graph is built once (sparse, weighted by distance) and applied with
+# a single bincount per tick, so a tick is a handful of array operations.
+
+MIN_LEVEL, MAX_LEVEL = 1.0, 5.0
+DECAY = 0.15
+DIFFUSION = 0.10
+VOLATILITY = 0.35         # std-dev of the per-tick noise, in risk levels
+NEIGHBOR_KM = 2.0
+MAX_NEIGHBORS = 8
+
+# Offset added to the baseline per hour (0-23), by the kind of crime at the hotspot
+HOURLY_PROFILES = {
+    # crowd crimes peak with tourist footfall: late morning to evening
+    "crowd": [-0.6] * 6 + [-0.3, -0.1, 0.1, 0.3, 0.4, 0.5, 0.5, 0.4, 0.4, 0.5, 0.6, 0.7, 0.7, 0.5, 0.2, 0.0, -0.3, -0.5],
+    # night crimes peak after dark
+    "night": [1.0, 1.0, 0.9, 0.7, 0.4, 0.0, -0.4, -0.6, -0.7, -0.7, -0.7, -0.6,
+              -0.6, -0.6, -0.5, -0.4, -0.2, 0.1, 0.4, 0.6, 0.8, 0.9, 1.0, 1.0],
+    "flat": [0.0] * 24,
+}
+PROFILE_KEYWORDS = [  # first match wins
+    ("night", ("night", "drug", "red-light", "trafficking", "robbery", "violence", "arms")),
+    ("crowd", ("pickpocket", "theft", "scam", "touting", "fencing", "petty")),
+]
+PROFILE_NAMES = list(HOURLY_PROFILES)
+
+
+def profile_for(crime_type):
+    text = str(crime_type).lower()
+    for name, words in PROFILE_KEYWORDS:
+        if any(w in text for w in words):
+            return name
+    return "flat"
+
+
+def build_adjacency(lats, lngs, radius_km=NEIGHBOR_KM, max_neighbors=MAX_NEIGHBORS):
+    """Sparse neighbour graph as (rows, cols, weights); each row's weights sum to 1.
+
+    Keeps each hotspot's `max_neighbors` nearest within `radius_km`, weighted by
+    exp(-distance / radius_km).
+    """
+    rows, cols, dist = geo_index.nearest_neighbors(lats, lngs, max_neighbors, radius_km)
+    weights = np.exp(-dist / radius_km)
+    totals = np.bincount(rows, weights=weights, minlength=len(lats))
+    weights = weights / totals[rows]
+    return rows.astype(np.int32), cols.astype(np.int32), weights
+
+
+class RiskEngine:
+    def __init__(self, lats, lngs, baseline, crime_types=None, seed=None,
+                 decay=DECAY, diffusion=DIFFUSION, volatility=VOLATILITY,
+                 radius_km=NEIGHBOR_KM, max_neighbors=MAX_NEIGHBORS, levels=None):
+        self.baseline = np.clip(np.asarray(baseline, dtype=np.float64), MIN_LEVEL, MAX_LEVEL)
+        self.size = len(self.baseline)
+        # `levels`: current levels to continue from (e.g. after a restart); default the baseline
+        source = self.baseline if levels is None else np.asarray(levels, dtype=np.float64)
+        self.levels = np.clip(source, MIN_LEVEL, MAX_LEVEL)
+        self.rng = np.random.default_rng(seed)
+        self.decay, self.diffusion, self.volatility = decay, diffusion, volatility
+
+        if crime_types is None:
+            self.profile_ids = np.full(self.size, PROFILE_NAMES.index("flat"), dtype=np.int8)
+        else:
+            # classify each distinct crime type once, then broadcast back to the rows
+            kinds, inverse = np.unique(np.asarray(crime_types, dtype=str), return_inverse=True)
+            ids = np.array([PROFILE_NAMES.index(profile_for(k)) for k in kinds], dtype=np.int8)
+            self.profile_ids = ids[inverse.reshape(-1)]
+        self.profiles = np.array([HOURLY_PROFILES[name] for name in PROFILE_NAMES])  # (profiles, 24)
+
+        self.rows, self.cols, self.weights = build_adjacency(lats, lngs, radius_km, max_neighbors)
+        self.has_neighbors = np.bincount(self.rows, minlength=self.size) > 0
+
+    def target(self, hour):
+        return np.clip(self.baseline + self.profiles[self.profile_ids, hour % 24], MIN_LEVEL, MAX_LEVEL)
+
+    def step(self, hour=None):
+        """Advance every hotspot by one tick; returns the rounded int levels."""
+        if hour is None:
+            hour = time.localtime().tm_hour
+        levels = self.levels
+        spread = np.bincount(self.rows, weights=self.weights * levels[self.cols], minlength=self.size)
+        neighbour_mean = np.where(self.has_neighbors, spread, levels)
+        levels = (levels
+                  + self.decay * (self.target(hour) - levels)
+                  + self.diffusion * (neighbour_mean - levels)
+                  + self.rng.normal(0.0, self.volatility, self.size))
+        self.levels = np.clip(levels, MIN_LEVEL, MAX_LEVEL)
+        return self.risk_levels()
+
+    def risk_levels(self):
+        return np.rint(self.levels).astype(np.int8)
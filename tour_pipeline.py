@@ -0,0 +1,87 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import api_clients
+import metrics
+import lang_id
+
+# Own pool rather than asyncio.to_thread: asyncio.run() waits for the default executor
+# on exit, which would make a missed speculative fetch block the response.
+_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="tour-pipeline")
+
+# ---------------- ASYNC TOUR GUIDE PIPELINE ----------------
+# translate -> generate -> synthesize, with the blocking client calls pushed to threads.
+# For typed queries the description is fetched speculatively for the raw text while
+# the translation is still in flight; when translating doesn't change the place name
+# (the common case for English input) the speculative result is used as-is.
+# Input identified as English skips translation entirely; other non-Latin input will
+# always be rewritten by translation, so it is not speculated on.
+
+
+def _normalize(text):
+    return " ".join(text.lower().split())
+
+
+def _in_thread(fn, *args):
+    return asyncio.get_running_loop().run_in_executor(_pool, fn, *args)
+
+
+async def _to_english(text):
+    if lang_id.is_english(text):
+        return text.strip()
+    return await _in_thread(api_clients.translate, text, "en")
+
+
+async def _speak(text, lang_code, clean_for_audio, audio_path):
+    clean_text = clean_for_audio(text)
+    if not clean_text:
+        return None
+    return await _in_thread(api_clients.synthesize, clean_text, lang_code, audio_path)
+
+
+async def place_pipeline(place_text, lang_name, lang_code, get_info, clean_for_audio, audio_path):
+    """Returns (place_en, explanation, audio_path or None)."""
+    if lang_id.is_english(place_text):
+        place_en = place_text.strip()
+        explanation = await _in_thread(get_info, place_en, lang_name)
+        return place_en, explanation, await _speak(explanation, lang_code, clean_for_audio, audio_path)
+
+    translate_task = _in_thread(api_clients.translate, place_text, "en")
+    speculative = None
+    if "latin" in lang_id.script_counts(place_text):
+        speculative = _in_thread(get_info, place_text.strip(), lang_name)
+
+    place_en = await translate_task
+    if speculative is not None and _normalize(place_en) == _normalize(place_text):
+        explanation = await speculative
+    else:
+        if speculative is not None:
+            speculative.cancel()  # stop waiting; the worker thread finishes in the background
+        explanation = await _in_thread(get_info, place_en, lang_name)
+
+    return place_en, explanation, await _speak(explanation, lang_code, clean_for_audio, audio_path)
+
+
+async def doubt_pipeline(place, doubt_text, lang_name, lang_code, get_answer, clean_for_audio, audio_path):
+    """Returns (doubt_en, answer, audio_path or None)."""
+    doubt_en = await _to_english(doubt_text)
+    answer = await _in_thread(get_answer, place, doubt_en, lang_name)
+    return doubt_en, answer, await _speak(answer, lang_code, clean_for_audio, audio_path)
+
+
+@metrics.timed("tour.place_query")
+def run_place_query(*args, **kwargs):
+    return asyncio.run(place_pipeline(*args, **kwargs))
+
+
+@metrics.timed("tour.doubt_query")
+def run_doubt_query(*args, **kwargs):
+    return asyncio.run(doubt_pipeline(*args, **kwargs))
+
+
+def serial_place_query(place_text, lang_name, lang_code, get_info, clean_for_audio, audio_path):
+    """The original one-step-at-a-time path, kept for benchmarking against."""
+    place_en = api_clients.translate(place_text, "en")
+    explanation = get_info(place_en, lang_name)
+    audio = api_clients.synthesize(clean_for_audio(explanation), lang_code, audio_path)
+    return place_en, explanation, audio
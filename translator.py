@@ -1,12 +1,16 @@
 import streamlit as st
 import speech_recognition as sr
-from deep_translator import GoogleTranslator
-from gtts import gTTS
 from gtts.lang import tts_langs
 import tempfile
 import os
+import time
 import threading
 
+import api_clients
+import batch_translate
+import lang_id
+import metrics
+import voice_stream
 
 
 # playsound import with a fix for Windows (use playsound version 1.2.2)
@@ -28,58 +32,93 @@ available_langs = tts_langs()
 # invert to list of tuples for dropdown (lang_name, lang_code)
 lang_options = sorted([(name.title(), code) for code, name in available_langs.items()])
 
+# ---------------- SPEECH OUTPUT ----------------
+def synthesize_speech(text, lang_code):
+    """Path of a temporary MP3 of `text`; removed by play_file."""
+    fd, path = tempfile.mkstemp(suffix=".mp3")
+    os.close(fd)  # Close so gTTS can write
+    try:
+        api_clients.synthesize(text, lang_code, path)
+    except Exception:
+        os.remove(path)
+        raise
+    return path
+
+
+def play_file(path):
+    """Play and delete `path`; blocks until playback ends (call from a worker thread)."""
+    try:
+        with metrics.span("translator.playback"):
+            playsound(path)
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def play_speech(text, lang_code):
+    play_file(synthesize_speech(text, lang_code))
+
+
+def stop_continuous():
+    """Stop this session's continuous-mode microphone pipeline, if it is running."""
+    pipeline = st.session_state.get("voice_pipeline")
+    if pipeline is not None:
+        pipeline.stop()
+        st.session_state.voice_pipeline = None
+
+
+def translate_for(text, target_lang):
+    # Repeated phrases are answered from the persistent translation memory
+    return batch_translate.translate_one(text, target_lang)
+
 # ---------------- FUNCTION ----------------
 def speech_translator():
     def record_audio():
-        recognizer = sr.Recognizer()
-        with sr.Microphone() as source:
-            st.info("🎙 Listening... Please speak now.")
-            audio = recognizer.listen(source)
+        st.info("🎙 Listening... Please speak now.")
+        with metrics.span("translator.capture"):
+            pcm = voice_stream.capture_utterance()
         st.success("✅ Recording complete")
-        return audio
+        return pcm
 
-    def transcribe_audio(audio):
-        recognizer = sr.Recognizer()
+    def transcribe_audio(pcm):
         try:
-            text = recognizer.recognize_google(audio)
-            st.write(f"📝 Recognized Text: {text}")
-            return text
-        except sr.UnknownValueError:
+            with metrics.span("translator.recognize"):
+                text = voice_stream.google_recognizer(pcm) if pcm else ""
+            if text:
+                st.write(f"📝 Recognized Text: {text}")
+                return text
             st.error("❌ Could not understand audio")
         except sr.RequestError:
             st.error("❌ Could not request results from Google")
         return ""
 
     def translate_text(text, target_lang):
-        detected = translator.detect(text)
-        source_lang = detected.lang
+        source_lang = lang_id.detect_language(text)
         st.write(f"🔍 Detected source language: {source_lang}")
-        translated = translator.translate(text, src=source_lang, dest=target_lang)
-        st.write(f"🌐 Translated Text ({target_lang}): {translated.text}")
-        return translated.text
+        with metrics.span("translator.translate"):
+            translated = translate_for(text, target_lang)
+        st.write(f"🌐 Translated Text ({target_lang}): {translated}")
+        return translated
 
     def speak_text(text, lang_code):
         if lang_code not in available_langs:
             st.warning(f"❌ Text-to-speech not supported for language '{lang_code}'")
             return
-        
-        tts = gTTS(text=text, lang=lang_code)
-        fd, path = tempfile.mkstemp(suffix=".mp3")
-        os.close(fd)  # Close so gTTS can write
-        
+
         try:
-            tts.save(path)
-            
-            # Play audio in separate thread to avoid blocking Streamlit UI
-            def play_audio():
-                playsound(path)
-                if os.path.exists(path):
-                    os.remove(path)
-                    
-            threading.Thread(target=play_audio, daemon=True).start()
-            
+            path = synthesize_speech(text, lang_code)
         except Exception as e:
             st.error(f"Error playing audio: {e}")
+            return
+
+        # Play audio in separate thread to avoid blocking Streamlit UI
+        def play_audio():
+            try:
+                play_file(path)
+            except Exception as e:
+                print("Error playing audio:", e)
+
+        threading.Thread(target=play_audio, daemon=True).start()
 
     # UI: language selection dropdown with names, default English
     st.subheader("Select Target Language")
@@ -97,9 +136,63 @@ def speech_translator():
         original_text = transcribe_audio(audio)
 
         if original_text:
-            translated_text = GoogleTranslator(source='auto', target='en').translate("Bonjour")
+            translated_text = translate_text(original_text, target_language)
             speak_text(translated_text, target_language)
 
+    # ---------- PHRASEBOOK ----------
+    if st.checkbox("📚 Show Tourist Phrasebook"):
+        phrasebook = batch_translate.translate_batch(batch_translate.PHRASEBOOK, [target_language], source="en")
+        st.table([
+            {"Phrase": phrase, selected_lang_name: phrasebook.get((phrase, target_language), "")}
+            for phrase in batch_translate.PHRASEBOOK
+        ])
+
+    # ---------- CONTINUOUS MODE ----------
+    st.markdown("---")
+    st.subheader("🎧 Continuous Conversation")
+    continuous = st.checkbox("Keep listening and translate each sentence as soon as I finish it")
+    pipeline = st.session_state.get("voice_pipeline")
+
+    # Restart the pipeline when it is switched off or the target language changes
+    if pipeline is not None and (not continuous or st.session_state.get("voice_pipeline_lang") != target_language):
+        stop_continuous()
+        pipeline = None
+
+    if continuous:
+        if pipeline is None:
+            speak = (lambda t: play_speech(t, target_language)) if target_language in available_langs else None
+            pipeline = voice_stream.SegmentPipeline(
+                voice_stream.MicrophoneSource(),
+                voice_stream.google_recognizer,
+                lambda t: translate_for(t, target_language),
+                speak=speak,
+            ).start()
+            st.session_state.voice_pipeline = pipeline
+            st.session_state.voice_pipeline_lang = target_language
+            st.session_state.voice_log = []
+
+        st.info("🎙 Listening continuously... untick the box to stop.")
+        log_box = st.empty()
+        log = st.session_state.voice_log
+
+        def show_log():
+            for result in pipeline.drain():
+                if result:
+                    log.append(result)
+            lines = []
+            for r in log[-10:]:
+                if r.get("translated") is not None:
+                    lines.append(f"📝 {r['text']}  →  🌐 {r['translated']}  ({r['latency_ms']:.0f} ms)")
+                if r.get("error"):
+                    lines.append(f"⚠ {r['error']}")
+            log_box.markdown("\n\n".join(lines) or "…")
+
+        while pipeline.running:
+            show_log()
+            time.sleep(0.2)
+        show_log()  # whatever arrived as it stopped, e.g. a microphone error
+        st.warning("🎙 Listening stopped. Untick and tick the box to start again.")
+
 # ---------------- MAIN APP ----------------
 if __name__ == "__main__":
     speech_translator()
@@ -0,0 +1,363 @@
+import time
+import math
+import threading
+from collections import deque
+from queue import Queue, Empty, Full
+
+import numpy as np
+
+# ---------- CONFIG ----------
+SAMPLE_RATE = 16000
+SAMPLE_WIDTH = 2          # 16-bit mono PCM
+CHUNK = 512               # samples per read (32 ms at 16 kHz)
+NOISE_WINDOW_SEC = 5.0    # recent chunk energies the noise floor is estimated from
+NOISE_PERCENTILE = 10     # ... the quietest 10% of them are taken as background
+ENERGY_RATIO = 2.5        # speech threshold = noise floor * ratio
+MIN_ENERGY = 300.0        # never go below this threshold (int16 RMS)
+START_CHUNKS = 3          # consecutive voiced chunks needed to open an utterance
+PRE_ROLL_SEC = 0.3        # audio kept from before the trigger so first syllables aren't cut
+SILENCE_SEC = 0.5         # trailing silence that closes an utterance
+MAX_UTTERANCE_SEC = 10.0
+# ----------------------------
+
+
+# ---------------- AUDIO SOURCES ----------------
+class MicrophoneSource:
+    """Raw PCM chunks from the default microphone (via speech_recognition's PyAudio stream)."""
+
+    def __init__(self, sample_rate=SAMPLE_RATE, chunk=CHUNK):
+        import speech_recognition as sr
+        self.mic = sr.Microphone(sample_rate=sample_rate, chunk_size=chunk)
+        self.sample_rate = sample_rate
+        self.chunk = chunk
+        self.stream = None
+
+    def __enter__(self):
+        self.mic.__enter__()
+        self.stream = self.mic.stream
+        return self
+
+    def __exit__(self, *exc):
+        self.stream = None
+        return self.mic.__exit__(*exc)
+
+    def read(self):
+        return self.stream.read(self.chunk)
+
+
+class SyntheticSource:
+    """Stand-in source for tests: plays `pattern` of (seconds, amplitude) segments, then ends.
+
+    Amplitude 0 is near-silence; anything above a few thousand reads as speech.
+    With `realtime=True` reads are paced like a real microphone.
+    """
+
+    def __init__(self, pattern, sample_rate=SAMPLE_RATE, chunk=CHUNK, realtime=False, seed=0):
+        self.sample_rate = sample_rate
+        self.chunk = chunk
+        self.realtime = realtime
+        rng = np.random.default_rng(seed)
+        parts = []
+        for seconds, amplitude in pattern:
+            n = int(seconds * sample_rate)
+            noise = rng.normal(0, 50, n)
+            tone = amplitude * np.sin(2 * math.pi * 220 * np.arange(n) / sample_rate)
+            parts.append(noise + tone)
+        self.samples = np.concatenate(parts).clip(-32768, 32767).astype(np.int16) if parts else np.zeros(0, np.int16)
+        self.pos = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def read(self):
+        if self.pos >= len(self.samples):
+            return b""
+        block = self.samples[self.pos:self.pos + self.chunk]
+        self.pos += self.chunk
+        if self.realtime:
+            time.sleep(len(block) / self.sample_rate)
+        return block.tobytes()
+
+
+# ---------------- VAD SEGMENTATION ----------------
+def rms(chunk_bytes):
+    samples = np.frombuffer(chunk_bytes, dtype=np.int16).astype(np.float32)
+    if samples.size == 0:
+        return 0.0
+    return float(np.sqrt(np.mean(samples * samples)))
+
+
+# Noise floor learned by earlier captures; each new VAD starts from it instead of
+# spending its first half second on calibration.
+_noise_floor = MIN_ENERGY / ENERGY_RATIO
+
+
+class EnergyVAD:
+    """Cuts a chunk stream into utterances using an adaptive energy threshold.
+
+    The noise floor is a low percentile of the last few seconds of chunk energies
+    heard between utterances, seeded with `noise_floor`, so detection starts on the
+    first chunk and neither speech at the very start of a stream nor a long
+    utterance can be mistaken for background noise.
+    """
+
+    def __init__(self, sample_rate=SAMPLE_RATE, chunk=CHUNK, noise_floor=None):
+        chunk_sec = chunk / sample_rate
+        self.noise_floor = _noise_floor if noise_floor is None else noise_floor
+        window = max(1, int(NOISE_WINDOW_SEC / chunk_sec))
+        self.recent = deque([self.noise_floor] * window, maxlen=window)
+        self.pre_roll = deque(maxlen=max(1, int(PRE_ROLL_SEC / chunk_sec)))
+        self.silence_chunks = max(1, int(SILENCE_SEC / chunk_sec))
+        self.max_chunks = int(MAX_UTTERANCE_SEC / chunk_sec)
+        self.voiced_run = 0
+        self.silent_run = 0
+        self.current = None
+
+    @property
+    def threshold(self):
+        return max(MIN_ENERGY, self.noise_floor * ENERGY_RATIO)
+
+    def feed(self, chunk_bytes):
+        """Feed one chunk; returns the finished utterance's PCM bytes, or None."""
+        energy = rms(chunk_bytes)
+        voiced = energy >= self.threshold
+        if self.current is None:
+            self.recent.append(energy)
+            self.noise_floor = float(np.percentile(self.recent, NOISE_PERCENTILE))
+            self.pre_roll.append(chunk_bytes)
+            self.voiced_run = self.voiced_run + 1 if voiced else 0
+            if self.voiced_run >= START_CHUNKS:
+                self.current = list(self.pre_roll)
+                self.pre_roll.clear()
+                self.silent_run = 0
+            return None
+
+        self.current.append(chunk_bytes)
+        self.silent_run = 0 if voiced else self.silent_run + 1
+        if self.silent_run >= self.silence_chunks or len(self.current) >= self.max_chunks:
+            return self.flush()
+        return None
+
+    def remember_noise_floor(self):
+        """Hand the learned floor to the next VAD created in this process."""
+        global _noise_floor
+        _noise_floor = self.noise_floor
+
+    def flush(self):
+        if not self.current:
+            return None
+        utterance = b"".join(self.current)
+        self.current = None
+        self.voiced_run = 0
+        return utterance
+
+
+# ---------------- BACKGROUND CAPTURE ----------------
+class CaptureThread(threading.Thread):
+    """Reads a source continuously and queues utterances as the VAD closes them.
+
+    The VAD's pre-roll deque is the ring buffer: the last few hundred ms are always
+    held so an utterance includes the audio from just before it was detected.
+    The stream always ends with None on `segments`; if the source fails, the error
+    is passed to `report` as {"error": ...} (or raised when there is none).
+    """
+
+    def __init__(self, source, segments: Queue, report=None):
+        super().__init__(daemon=True)
+        self.source = source
+        self.segments = segments
+        self.report = report
+        self.vad = EnergyVAD(source.sample_rate, source.chunk)
+        self.stop_event = threading.Event()
+
+    def run(self):
+        try:
+            with self.source:
+                while not self.stop_event.is_set():
+                    chunk = self.source.read()
+                    if not chunk:
+                        break
+                    utterance = self.vad.feed(chunk)
+                    if utterance:
+                        self.segments.put((time.perf_counter(), utterance))
+            self.vad.remember_noise_floor()
+            tail = self.vad.flush()
+            if tail:
+                self.segments.put((time.perf_counter(), tail))
+        except Exception as e:
+            if self.report is None:
+                raise
+            self.report({"error": f"audio capture failed: {e}"})
+        finally:
+            self.segments.put(None)  # always end the stream so the downstream stages exit
+
+    def stop(self):
+        self.stop_event.set()
+
+
+# ---------------- RECOGNIZERS ----------------
+def google_recognizer(pcm, sample_rate=SAMPLE_RATE, sample_width=SAMPLE_WIDTH):
+    import speech_recognition as sr
+    audio = sr.AudioData(pcm, sample_rate, sample_width)
+    try:
+        return sr.Recognizer().recognize_google(audio)
+    except sr.UnknownValueError:
+        return ""
+
+
+class ScriptedRecognizer:
+    """Stand-in recognizer: returns the given transcripts in order, one per segment."""
+
+    def __init__(self, transcripts, delay=0.0):
+        self.transcripts = list(transcripts)
+        self.delay = delay
+        self.calls = 0
+
+    def __call__(self, pcm, sample_rate=SAMPLE_RATE, sample_width=SAMPLE_WIDTH):
+        if self.delay:
+            time.sleep(self.delay)
+        text = self.transcripts[self.calls % len(self.transcripts)] if self.transcripts else ""
+        self.calls += 1
+        return text
+
+
+# ---------------- OVERLAPPED SEGMENT PIPELINE ----------------
+class SegmentPipeline:
+    """recognize -> translate -> speak, one thread per stage, so segment N+1 is being
+    recognized while segment N is translated and spoken.
+
+    Each finished segment is reported on `results` as a dict with the transcript,
+    translation and the latency from end-of-speech to audio being ready.
+    """
+
+    def __init__(self, source, recognize, translate, speak=None, sample_width=SAMPLE_WIDTH):
+        self.segments = Queue()
+        self.texts = Queue()
+        self.translations = Queue()
+        self.results = Queue(maxsize=100)
+        self.capture = CaptureThread(source, self.segments, report=self._report)
+        self.sample_rate = source.sample_rate
+        self.sample_width = sample_width
+        self.recognize = recognize
+        self.translate = translate
+        self.speak = speak
+        self.threads = [
+            self.capture,
+            threading.Thread(target=self._recognize_loop, daemon=True),
+            threading.Thread(target=self._translate_loop, daemon=True),
+            threading.Thread(target=self._speak_loop, daemon=True),
+        ]
+
+    def start(self):
+        for t in self.threads:
+            t.start()
+        return self
+
+    def stop(self):
+        self.capture.stop()
+
+    def join(self, timeout=None):
+        for t in self.threads:
+            t.join(timeout)
+
+    @property
+    def running(self):
+        return any(t.is_alive() for t in self.threads)
+
+    def _recognize_loop(self):
+        while True:
+            item = self.segments.get()
+            if item is None:
+                self.texts.put(None)
+                return
+            ended_at, pcm = item
+            try:
+                text = self.recognize(pcm, self.sample_rate, self.sample_width)
+            except Exception as e:
+                self._report({"error": f"recognition failed: {e}"})
+                continue
+            if text:
+                self.texts.put((ended_at, text))
+
+    def _translate_loop(self):
+        while True:
+            item = self.texts.get()
+            if item is None:
+                self.translations.put(None)
+                return
+            ended_at, text = item
+            try:
+                translated = self.translate(text)
+            except Exception as e:
+                self._report({"text": text, "error": f"translation failed: {e}"})
+                continue
+            self.translations.put((ended_at, text, translated))
+
+    def _speak_loop(self):
+        while True:
+            item = self.translations.get()
+            if item is None:
+                self._report(None)
+                return
+            ended_at, text, translated = item
+            error = None
+            if self.speak is not None:
+                try:
+                    self.speak(translated)
+                except Exception as e:
+                    error = f"speech failed: {e}"
+            self._report({
+                "text": text,
+                "translated": translated,
+                "latency_ms": (time.perf_counter() - ended_at) * 1000,
+                "error": error,
+            })
+
+    def _report(self, result):
+        try:
+            self.results.put_nowait(result)
+        except Full:
+            pass  # nobody is reading; drop rather than stall the audio path
+
+    def drain(self):
+        """All results available right now (None marks the end of the stream)."""
+        out = []
+        while True:
+            try:
+                out.append(self.results.get_nowait())
+            except Empty:
+                return out
+
+
+# ---------------- SINGLE UTTERANCE ----------------
+def capture_utterance(source=None, timeout=15.0):
+    """PCM bytes of the first complete utterance from `source` ("" if none before `timeout`).
+
+    Replaces `Recognizer.listen()`: the utterance ends on a short VAD silence instead of
+    the default pause threshold, and there is no ambient-noise pass per press; the noise
+    floor learned by the previous capture is reused.
+    """
+    source = source or MicrophoneSource()
+    vad = EnergyVAD(source.sample_rate, source.chunk)
+    deadline = time.monotonic() + timeout
+    utterance = None
+    with source:
+        while utterance is None and time.monotonic() < deadline:
+            chunk = source.read()
+            if not chunk:
+                break
+            utterance = vad.feed(chunk)
+    vad.remember_noise_floor()
+    return utterance or vad.flush() or b""
+
+
+def listen_once(source=None, recognize=google_recognizer, timeout=15.0):
+    """Capture one utterance and return its transcript ("" if nothing was understood)."""
+    source = source or MicrophoneSource()
+    pcm = capture_utterance(source, timeout)
+    if not pcm:
+        return ""
+    return recognize(pcm, source.sample_rate, SAMPLE_WIDTH)